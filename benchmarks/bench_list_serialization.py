@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Serialization cost of a submissions list page: the old dict + jsonable_encoder
+path against the typed page model dumped by pydantic-core.
+
+Usage:
+    python benchmarks/bench_list_serialization.py [items] [solution_bytes]
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "fastapi_app"))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from models import Submission, SubmissionPage, SubmissionStatus
+
+EXCLUDE_SOLUTION = {"submissions": {"__all__": {"solution"}}}
+
+def synthetic_page(n_items=100, solution_bytes=4096):
+    submissions = [
+        Submission(id=f"sub_{i:08x}_20250101_000000", challenge_id=i % 3 + 1,
+                   solution="x = 1\n" * (solution_bytes // 6), status=SubmissionStatus.ACCEPTED,
+                   submitted_at=datetime.now(), score=100)
+        for i in range(n_items)
+    ]
+    return dict(submissions=submissions, total=10 * n_items, limit=n_items, offset=0,
+                next_cursor="azox", timestamp=datetime.now().isoformat())
+
+def old_path(fields):
+    # What FastAPI does for response_model=dict: validate, jsonable_encoder, json.dumps
+    return JSONResponse(jsonable_encoder(dict(fields))).body
+
+def new_path(fields, exclude=None):
+    return SubmissionPage.model_construct(**fields).model_dump_json(exclude=exclude).encode()
+
+def timed(label, func, repeat):
+    func()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        size = len(func())
+    per_call = (time.perf_counter() - start) / repeat
+    print(f"{label:<28} {per_call * 1e3:8.3f} ms/page  {size / 1024:8.1f} KiB")
+    return per_call
+
+def main():
+    n_items = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    solution_bytes = int(sys.argv[2]) if len(sys.argv) > 2 else 4096
+    fields = synthetic_page(n_items, solution_bytes)
+    assert json.loads(old_path(fields)) == json.loads(new_path(fields))
+
+    repeat = 200
+    old = timed("dict + jsonable_encoder", lambda: old_path(fields), repeat)
+    new = timed("page model_dump_json", lambda: new_path(fields), repeat)
+    slim = timed("model_dump_json, no solution", lambda: new_path(fields, EXCLUDE_SOLUTION), repeat)
+    print(f"speedup: {old / new:.1f}x (with solutions), {old / slim:.1f}x (without)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Time and peak memory of solutions/solution_1.solve on synthetic schedules.
+
+Usage:
+    python benchmarks/bench_solution.py [tasks] [stations]
+"""
+
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from solutions.solution_1 import solve
+
+def synthetic_instance(n_tasks=100_000, n_stations=50, seed=2025):
+    """A connected subway line plus random shortcuts, and short tasks spread over time"""
+    rng = random.Random(seed)
+    subway = [{"connection": [i, i + 1], "fee": rng.randint(1, 9)} for i in range(n_stations - 1)]
+    subway += [
+        {"connection": [rng.randrange(n_stations), rng.randrange(n_stations)], "fee": rng.randint(1, 20)}
+        for _ in range(n_stations)
+    ]
+    tasks = []
+    for i in range(n_tasks):
+        start = rng.randint(0, 10 * n_tasks)
+        tasks.append({"name": f"T{i}", "start": start, "end": start + rng.randint(1, 50),
+                      "station": rng.randrange(n_stations), "score": rng.randint(1, 9)})
+    return {"tasks": tasks, "subway": subway, "starting_station": 0}
+
+def main():
+    n_tasks = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    n_stations = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    instance = synthetic_instance(n_tasks, n_stations)
+
+    start = time.perf_counter()
+    solve(instance)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    result = solve(instance)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"solve: {n_tasks} tasks, {n_stations} stations")
+    print("-" * 50)
+    print(f"time        {elapsed:8.3f}s")
+    print(f"peak memory {peak / 2**20:8.1f} MiB (excluding input)")
+    print(f"max_score={result['max_score']} min_fee={result['min_fee']} tasks={len(result['schedule'])}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the /api/ticketing-agent scoring backends.
+
+Usage:
+    python benchmarks/bench_ticketing.py [customers] [concerts]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from flask_app.ticketing import BACKENDS, parse_concerts
+
+def synthetic_payload(n_customers=10_000, n_concerts=1_000, seed=2025):
+    """Customers and concerts spread over a 100x100 map, half the cards prioritized"""
+    rng = random.Random(seed)
+    concerts = [
+        {"name": f"Concert {i}", "booking_center_location": [rng.uniform(0, 100), rng.uniform(0, 100)]}
+        for i in range(n_concerts)
+    ]
+    cards = [f"CARD-{i}" for i in range(200)]
+    customers = [
+        {"name": f"Customer {i}", "vip_status": rng.random() < 0.2,
+         "location": [rng.uniform(0, 100), rng.uniform(0, 100)], "credit_card": rng.choice(cards)}
+        for i in range(n_customers)
+    ]
+    priority = {card: f"Concert {rng.randrange(n_concerts)}" for card in cards[::2]}
+    return customers, concerts, priority
+
+def main():
+    n_customers = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    n_concerts = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+    customers, concerts, priority = synthetic_payload(n_customers, n_concerts)
+    clist = parse_concerts(concerts)
+
+    print(f"Ticketing backends: {n_customers} customers x {n_concerts} concerts")
+    print("-" * 50)
+    baseline, expected = None, None
+    for name, assign in BACKENDS.items():
+        start = time.perf_counter()
+        out = assign(customers, clist, priority)
+        elapsed = time.perf_counter() - start
+        if baseline is None:
+            baseline, expected = elapsed, out
+        status = "ok" if out == expected else "MISMATCH"
+        print(f"{name:<8} {elapsed:8.3f}s  {baseline / elapsed:7.1f}x  {status}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark for the process-pool ticketing backend.
+
+Usage:
+    python benchmarks/bench_ticketing_pool.py [customers] [concerts] [max_workers]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from flask_app import ticketing
+from flask_app.ticketing import assign_parallel, parse_concerts
+from bench_ticketing import synthetic_payload
+
+def main():
+    n_customers = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    n_concerts = int(sys.argv[2]) if len(sys.argv) > 2 else 5_000
+    max_workers = int(sys.argv[3]) if len(sys.argv) > 3 else (os.cpu_count() or 1)
+    customers, concerts, priority = synthetic_payload(n_customers, n_concerts)
+    clist = parse_concerts(concerts)
+    ticketing.POOL_MIN_CUSTOMERS = 0
+
+    print(f"Process pool scaling: {n_customers} customers x {n_concerts} concerts")
+    print("-" * 50)
+    workers, baseline, expected = 1, None, None
+    while workers <= max_workers:
+        start = time.perf_counter()
+        out = assign_parallel(customers, clist, priority, workers=workers)
+        elapsed = time.perf_counter() - start
+        if baseline is None:
+            baseline, expected = elapsed, out
+        status = "ok" if out == expected else "MISMATCH"
+        print(f"{workers:>3} workers {elapsed:8.3f}s  {baseline / elapsed:5.2f}x  {status}")
+        workers *= 2
+
+if __name__ == "__main__":
+    main()
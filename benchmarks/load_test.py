@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Async load generator for the running servers; prints a JSON report.
+
+Each scenario is driven by `--concurrency` workers sharing one pooled httpx
+client, for `--requests` requests or `--duration` seconds. With `--rate`
+the scenario is open-loop: requests are scheduled at fixed intervals, and
+latency is measured from the scheduled time, so queueing in the server
+shows up in the tail instead of silently lowering the offered load.
+
+Usage:
+    python benchmarks/load_test.py [--scenarios challenges,submissions-list]
+        [--concurrency 32] [--requests 2000 | --duration 30] [--rate 500]
+        [--payload-size 1000] [--output report.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks.bench_ticketing import synthetic_payload
+
+FLASK_URL = os.getenv("FLASK_URL", "http://localhost:5000")
+FASTAPI_URL = os.getenv("FASTAPI_URL", "http://localhost:8000")
+
+def build_scenarios(payload_size, seed=2025):
+    """name -> (base URL, request factory); `payload_size` scales solutions and ticketing inputs"""
+    rng = random.Random(seed)
+    solution = "def two_sum(nums, target):\n" + "    pass\n" * max(1, payload_size // 9)
+    customers, concerts, priority = synthetic_payload(payload_size, max(1, payload_size // 10), seed)
+    ticketing = {"customers": customers, "concerts": concerts, "priority": priority}
+
+    return {
+        "challenges": (FASTAPI_URL, lambda: ("GET", "/api/challenges/", {"params": {"limit": 100}})),
+        "submissions-create": (FASTAPI_URL, lambda: (
+            "POST", "/api/submissions/", {"json": {"challenge_id": rng.randint(1, 3), "solution": solution}})),
+        "submissions-list": (FASTAPI_URL, lambda: (
+            "GET", "/api/submissions/", {"params": {"limit": 100, "challenge_id": rng.randint(1, 3)}})),
+        "ticketing": (FLASK_URL, lambda: ("POST", "/api/ticketing-agent", {"json": ticketing})),
+    }
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * q // 100))
+    return sorted_values[int(rank) - 1]
+
+def summarize(latencies, errors, elapsed):
+    latencies = sorted(latencies)
+    total = len(latencies)
+    return {
+        "requests": total,
+        "errors": errors,
+        "error_rate": errors / total if total else 0.0,
+        "rps": total / elapsed if elapsed else 0.0,
+        "elapsed_s": elapsed,
+        "latency_ms": {
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "mean": sum(latencies) / total if total else None,
+            "max": latencies[-1] if latencies else None,
+        },
+    }
+
+async def run_scenario(client, base_url, make_request, concurrency, n_requests=None,
+                       duration=None, rate=None):
+    """Drive one scenario to completion; returns its summary"""
+    latencies, errors = [], 0
+    issued = 0
+    start = time.perf_counter()
+    deadline = start + duration if duration else None
+
+    def next_slot():
+        # Claim the next request; None once the budget (count or time) is spent
+        nonlocal issued
+        if n_requests is not None and issued >= n_requests:
+            return None
+        scheduled = start + issued / rate if rate else time.perf_counter()
+        if deadline is not None and scheduled >= deadline:
+            return None
+        issued += 1
+        return scheduled
+
+    async def worker():
+        nonlocal errors
+        while (scheduled := next_slot()) is not None:
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            method, path, kwargs = make_request()
+            try:
+                response = await client.request(method, base_url + path, **kwargs)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies.append((time.perf_counter() - scheduled) * 1000)
+            errors += failed
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, cwd=os.path.dirname(__file__)).stdout.strip() or None
+    except OSError:
+        return None
+
+async def main_async(args):
+    scenarios = build_scenarios(args.payload_size)
+    names = args.scenarios.split(",") if args.scenarios else list(scenarios)
+    unknown = set(names) - set(scenarios)
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "commit": git_commit(),
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "scenarios": {},
+    }
+    async with httpx.AsyncClient(limits=limits, timeout=args.timeout) as client:
+        for name in names:
+            base_url, make_request = scenarios[name]
+            report["scenarios"][name] = await run_scenario(
+                client, base_url, make_request, args.concurrency,
+                n_requests=None if args.duration else args.requests,
+                duration=args.duration, rate=args.rate)
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the Flask and FastAPI servers")
+    parser.add_argument("--scenarios", help="comma-separated subset of: challenges, submissions-create, "
+                                            "submissions-list, ticketing (default: all)")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=1000, help="requests per scenario")
+    parser.add_argument("--duration", type=float, help="seconds per scenario (overrides --requests)")
+    parser.add_argument("--rate", type=float, help="target requests/s per scenario (default: as fast as possible)")
+    parser.add_argument("--payload-size", type=int, default=100,
+                        help="customers per ticketing request and approximate solution size in bytes")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(main_async(args))
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import os
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, Index, Integer, String, Text, event
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# Sync URLs from .env are mapped onto their asyncio drivers
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+def async_database_url(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    return ASYNC_DRIVERS.get(scheme, scheme) + sep + rest
+
+class Base(DeclarativeBase):
+    pass
+
+class ChallengeRow(Base):
+    __tablename__ = "challenges"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    name: Mapped[str] = mapped_column(String(200))
+    difficulty: Mapped[str] = mapped_column(String(16), index=True)
+    points: Mapped[int] = mapped_column(Integer)
+    description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime)
+
+class SubmissionRow(Base):
+    """
+    `seq` is the insertion order and the keyset for pagination; every filter
+    combination the API offers has an index ending in seq, so a page is one
+    index range scan.
+    """
+    __tablename__ = "submissions"
+
+    seq: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    id: Mapped[str] = mapped_column(String(64), unique=True)
+    challenge_id: Mapped[int] = mapped_column(Integer)
+    solution: Mapped[str] = mapped_column(Text)
+    status: Mapped[str] = mapped_column(String(16))
+    submitted_at: Mapped[datetime] = mapped_column(DateTime, index=True)
+    score: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+
+    __table_args__ = (
+        Index("ix_submissions_challenge_seq", "challenge_id", "seq"),
+        Index("ix_submissions_status_seq", "status", "seq"),
+        Index("ix_submissions_challenge_status_seq", "challenge_id", "status", "seq"),
+        Index("ix_submissions_score_seq", "score", "seq"),
+        Index("ix_submissions_challenge_score_seq", "challenge_id", "score", "seq"),
+    )
+
+def create_engine(url: Optional[str] = None) -> AsyncEngine:
+    """Pooled async engine for DATABASE_URL; SQLite files are switched to WAL"""
+    url = async_database_url(url or os.getenv("DATABASE_URL", "sqlite:///./challenge.db"))
+    options = {"pool_pre_ping": True}
+    in_memory = url.startswith("sqlite") and (":memory:" in url or url.endswith(":///"))
+    if not in_memory:  # in-memory SQLite uses a single static connection
+        if url.startswith("sqlite"):
+            options["poolclass"] = AsyncAdaptedQueuePool  # aiosqlite defaults to NullPool
+        options.update(pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+                       max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")))
+    engine = create_async_engine(url, **options)
+
+    if url.startswith("sqlite"):
+        @event.listens_for(engine.sync_engine, "connect")
+        def _sqlite_pragmas(dbapi_connection, connection_record):
+            # WAL lets readers in other workers proceed while one writer commits
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute("PRAGMA busy_timeout=5000")
+            cursor.close()
+
+    return engine
+
+def create_sessionmaker(engine: AsyncEngine) -> async_sessionmaker:
+    return async_sessionmaker(engine, expire_on_commit=False)
+
+async def create_tables(engine: AsyncEngine):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
@@ -0,0 +1,107 @@
+import asyncio
+import os
+from contextlib import contextmanager
+from typing import AsyncIterator, Callable, Dict, Hashable, Optional, Set
+
+# Events buffered per subscriber before it counts as too slow and is dropped
+SSE_QUEUE_SIZE = int(os.getenv("SSE_QUEUE_SIZE", "64"))
+# Seconds between keep-alive comments on an idle stream
+SSE_KEEPALIVE = float(os.getenv("SSE_KEEPALIVE", "15"))
+
+# Put on a dropped subscriber's queue so its stream wakes up and ends
+DROPPED = None
+# Put on every subscriber's queue when the topic's subject is deleted
+DELETED = object()
+
+class EventHub:
+    """
+    In-process pub/sub keyed by topic (e.g. ("submission", id)).
+
+    Each subscriber owns a bounded asyncio.Queue, so an idle watcher is just
+    a coroutine parked on `queue.get()`. `publish` never waits: a subscriber
+    whose queue is full is dropped rather than slowing the publisher down.
+    Must only be used from the event loop thread.
+    """
+
+    def __init__(self, queue_size: int = SSE_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._topics: Dict[Hashable, Set[asyncio.Queue]] = {}
+
+    def subscriber_count(self, topic: Hashable) -> int:
+        return len(self._topics.get(topic, ()))
+
+    def subscribe(self, topic: Hashable) -> asyncio.Queue:
+        queue = asyncio.Queue(self.queue_size)
+        self._topics.setdefault(topic, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, topic: Hashable, queue: asyncio.Queue):
+        queues = self._topics.get(topic)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._topics[topic]
+
+    @contextmanager
+    def subscription(self, topic: Hashable):
+        queue = self.subscribe(topic)
+        try:
+            yield queue
+        finally:
+            self.unsubscribe(topic, queue)
+
+    def publish(self, topic: Hashable, event: str) -> int:
+        """Queue `event` for every subscriber of `topic`; returns how many received it"""
+        delivered = 0
+        for queue in list(self._topics.get(topic, ())):
+            try:
+                queue.put_nowait(event)
+                delivered += 1
+            except asyncio.QueueFull:
+                self.unsubscribe(topic, queue)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(DROPPED)
+        return delivered
+
+    def close(self, topic: Hashable):
+        """End every subscription to `topic`, e.g. once the submission it follows is deleted"""
+        for queue in self._topics.pop(topic, ()):
+            if queue.full():
+                # The events still queued are about something that no longer exists
+                while not queue.empty():
+                    queue.get_nowait()
+            queue.put_nowait(DELETED)
+
+def sse_message(data: str, event: str = "message") -> str:
+    return f"event: {event}\ndata: {data}\n\n"
+
+async def event_stream(queue: asyncio.Queue, first: Optional[str] = None,
+                       last: Callable[[str], bool] = lambda data: False,
+                       keepalive: float = SSE_KEEPALIVE) -> AsyncIterator[str]:
+    """
+    SSE frames for a subscription: `first` (the current state) if given, then
+    each published event until `last(data)` is true, the subscriber is dropped
+    or the topic is closed.
+    """
+    if first is not None:
+        yield sse_message(first)
+        if last(first):
+            return
+    while True:
+        try:
+            data = await asyncio.wait_for(queue.get(), keepalive)
+        except asyncio.TimeoutError:
+            yield ": keepalive\n\n"
+            continue
+        if data is DROPPED:
+            yield sse_message("{}", event="dropped")
+            return
+        if data is DELETED:
+            yield sse_message("{}", event="deleted")
+            return
+        yield sse_message(data)
+        if last(data):
+            return
+
+event_hub = EventHub()
@@ -0,0 +1,392 @@
+import asyncio
+import copy
+import hashlib
+import multiprocessing
+import os
+import signal
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows: no rlimits, only the wall-clock timeout applies
+    resource = None
+
+from models import SubmissionStatus
+
+# Grading limits (overridable through the environment)
+GRADER_WORKERS = int(os.getenv("GRADER_WORKERS", str(os.cpu_count() or 1)))
+GRADING_QUEUE_SIZE = int(os.getenv("GRADING_QUEUE_SIZE", "1000"))
+GRADING_BACKLOG_SIZE = int(os.getenv("GRADING_BACKLOG_SIZE", "1000"))    # jobs waiting for queue space
+GRADING_TIME_LIMIT = float(os.getenv("GRADING_TIME_LIMIT", "2.0"))        # wall seconds per run
+GRADING_CPU_LIMIT = int(os.getenv("GRADING_CPU_LIMIT", "2"))              # CPU seconds per run
+GRADING_MEMORY_LIMIT = int(os.getenv("GRADING_MEMORY_LIMIT", str(256 * 2**20)))  # bytes
+GRADING_KILL_GRACE = float(os.getenv("GRADING_KILL_GRACE", "5"))          # seconds past the limits before a run is killed
+GRADING_INLINE_WAIT = float(os.getenv("GRADING_INLINE_WAIT", "1.0"))      # seconds create_submission waits
+GRADING_CACHE_SIZE = int(os.getenv("GRADING_CACHE_SIZE", "10000"))        # results kept per process
+GRADING_CACHE_TTL = float(os.getenv("GRADING_CACHE_TTL", "3600"))         # seconds a result is reused
+
+# Per-challenge test cases: entrypoint function name and (args, expected) pairs.
+# Challenges without an entry keep the basic length check.
+CHALLENGE_TESTS = {
+    1: ("two_sum", [
+        (([2, 7, 11, 15], 9), [0, 1]),
+        (([3, 2, 4], 6), [1, 2]),
+        (([3, 3], 6), [0, 1]),
+        (([-1, -2, -3, -4, -5], -8), [2, 4]),
+    ]),
+    2: ("is_valid", [
+        (("()",), True),
+        (("()[]{}",), True),
+        (("(]",), False),
+        (("([)]",), False),
+        (("{[]}",), True),
+        (("",), True),
+    ]),
+    3: ("merge_sort", [
+        (([5, 2, 4, 6, 1, 3],), [1, 2, 3, 4, 5, 6]),
+        (([],), []),
+        (([1],), [1]),
+        (([3, -1, 3, 0],), [-1, 0, 3, 3]),
+    ]),
+}
+
+# Results compared order-insensitively (any valid index order is accepted)
+UNORDERED_RESULTS = {1}
+
+class TimeLimitExceeded(Exception):
+    pass
+
+def _raise_time_limit(signum, frame):
+    raise TimeLimitExceeded()
+
+def _apply_limits(cpu_seconds, memory_bytes, wall_seconds):
+    if resource is not None:
+        # Soft CPU limit raises SIGXCPU (handled below); the hard limit kills the process
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+        resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+        signal.signal(signal.SIGXCPU, _raise_time_limit)
+    if hasattr(signal, "setitimer"):
+        signal.signal(signal.SIGALRM, _raise_time_limit)
+        signal.setitimer(signal.ITIMER_REAL, wall_seconds)
+
+def run_tests(challenge_id, solution, cpu_seconds, memory_bytes, wall_seconds):
+    """
+    Run one solution against its challenge's test cases, returning
+    (status, score, limited) where `limited` says a time or memory limit fired.
+
+    Executes in a fresh pool process (one task per child), so the rlimits set
+    here only ever apply to this run. Anything the solution raises, including
+    SystemExit and KeyboardInterrupt, is a verdict and never leaves this function.
+    """
+    entrypoint, cases = CHALLENGE_TESTS[challenge_id]
+    passed = 0
+    limited = False
+    try:
+        _apply_limits(cpu_seconds, memory_bytes, wall_seconds)
+        namespace = {"__name__": "solution"}
+        exec(compile(solution, "<solution>", "exec"), namespace)
+        func = namespace.get(entrypoint)
+        if not callable(func):
+            return SubmissionStatus.REJECTED.value, 0, False
+        for args, expected in cases:
+            try:
+                result = func(*copy.deepcopy(args))
+                if challenge_id in UNORDERED_RESULTS:
+                    result, expected = sorted(result), sorted(expected)
+                if result == expected:
+                    passed += 1
+            except TimeLimitExceeded:
+                limited = True
+                break
+            except MemoryError:
+                limited = True
+            except BaseException:
+                pass
+    except (TimeLimitExceeded, MemoryError):
+        limited = True
+    except BaseException:
+        return SubmissionStatus.REJECTED.value, 0, False
+    finally:
+        if hasattr(signal, "setitimer"):
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+    score = passed * 100 // len(cases)
+    status = SubmissionStatus.ACCEPTED if passed == len(cases) else SubmissionStatus.REJECTED
+    return status.value, score, limited
+
+def basic_grade(solution):
+    """Placeholder check for challenges that have no test cases"""
+    if len(solution.strip()) > 10:
+        return SubmissionStatus.ACCEPTED, 85
+    return SubmissionStatus.REJECTED, 0
+
+def normalize_solution(solution: str) -> str:
+    """
+    Unify line endings and drop whitespace at the end of the file. Nothing
+    inside the source changes, since a blank line or trailing space there can
+    sit in a string literal and change what the solution returns.
+    """
+    return solution.replace("\r\n", "\n").replace("\r", "\n").rstrip()
+
+def solution_key(challenge_id: int, solution: str) -> str:
+    return hashlib.sha256(f"{challenge_id}\0{normalize_solution(solution)}".encode()).hexdigest()
+
+class ResultCache:
+    """LRU of (status, score) by solution_key, with entries expiring after `ttl` seconds"""
+
+    def __init__(self, max_entries: int = GRADING_CACHE_SIZE, ttl: float = GRADING_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Tuple[SubmissionStatus, int]]]" = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Tuple[SubmissionStatus, int]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, result = entry
+        if expires < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return result
+
+    def put(self, key: str, result: Tuple[SubmissionStatus, int]):
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+# Only verdicts of a run that finished within its limits are reused: a limit hit
+# may be a loaded host, and ERROR is a crash or a run the parent had to kill
+CACHEABLE_STATUSES = {SubmissionStatus.ACCEPTED, SubmissionStatus.REJECTED}
+
+@dataclass
+class GradingJob:
+    submission_id: str
+    challenge_id: int
+    solution: str
+    done: asyncio.Future = field(default=None)
+    key: Optional[str] = field(default=None)
+    limited: bool = False  # set when a time or memory limit cut the run short
+
+    def __post_init__(self):
+        # Only runs against test cases are shared; basic_grade is cheaper than a lookup
+        if self.key is None and self.challenge_id in CHALLENGE_TESTS:
+            self.key = solution_key(self.challenge_id, self.solution)
+
+def _kill_pool(pool: ProcessPoolExecutor):
+    """
+    Shut a pool down without waiting for its runs. Its processes are killed
+    first: a solution can catch or replace the in-child limit signals, and
+    only the parent can end such a run. Futures still on the pool fail with
+    BrokenProcessPool.
+    """
+    for process in list((pool._processes or {}).values()):
+        process.kill()
+    pool.shutdown(wait=False)
+
+class Grader:
+    """
+    Bounded asyncio queue feeding a process pool.
+
+    `submit` never blocks the event loop: it returns the job's future when the
+    job was queued, or None when the queue is full (the caller answers 202 and
+    the job waits in a backlog of at most `backlog_size` jobs until there is
+    room). Callers check `has_room` before accepting work; a job that still
+    finds queue and backlog full is finished as ERROR rather than held
+    without bound. Results go to `on_result(submission_id, status, score)`.
+
+    Jobs for challenges with test cases are keyed by challenge plus normalized
+    solution. A key with a cached result completes straight away; a key
+    already queued or running joins that job (single-flight) and gets its
+    result instead of a run of its own.
+    """
+
+    def __init__(self, on_result: Callable[[str, SubmissionStatus, int], Awaitable[None]],
+                 workers: int = GRADER_WORKERS, queue_size: int = GRADING_QUEUE_SIZE,
+                 backlog_size: int = GRADING_BACKLOG_SIZE):
+        self.on_result = on_result
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+        self.backlog_size = backlog_size
+        self.backlog = 0  # jobs waiting in _put_all for queue space
+        self.queue: Optional[asyncio.Queue] = None
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.tasks = []
+        self.pending = set()
+        self.cache = ResultCache()
+        self.inflight: Dict[str, List[GradingJob]] = {}  # key -> leader job, then its followers
+
+    @property
+    def running(self):
+        return self.queue is not None
+
+    def _new_pool(self, workers=None, max_tasks_per_child=1):
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            # Fork each run from a small server that has only this module loaded
+            ctx = multiprocessing.get_context("forkserver")
+            ctx.set_forkserver_preload([__name__])
+        else:
+            ctx = multiprocessing.get_context("spawn")
+        return ProcessPoolExecutor(workers or self.workers, mp_context=ctx,
+                                   max_tasks_per_child=max_tasks_per_child)
+
+    async def start(self):
+        if self.running:
+            return
+        self.queue = asyncio.Queue(self.queue_size)
+        self.pool = self._new_pool()
+        self.tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        if not self.running:
+            return
+        for task in self.tasks + list(self.pending):
+            task.cancel()
+        await asyncio.gather(*self.tasks, *self.pending, return_exceptions=True)
+        _kill_pool(self.pool)
+        self.queue, self.pool, self.tasks, self.pending = None, None, [], set()
+        self.inflight = {}
+        self.backlog = 0
+
+    def has_room(self, jobs: int = 1) -> bool:
+        """Whether `jobs` more runs fit in the queue plus the backlog"""
+        if not self.running:
+            return True
+        outstanding = self.queue.qsize() + self.backlog
+        return outstanding + jobs <= self.queue.maxsize + self.backlog_size
+
+    def submit(self, submission_id, challenge_id, solution) -> Optional[asyncio.Future]:
+        job = GradingJob(submission_id, challenge_id, solution, asyncio.get_running_loop().create_future())
+        return job.done if self._enqueue([job]) else None
+
+    def submit_many(self, jobs) -> int:
+        """Queue (submission_id, challenge_id, solution) tuples; returns how many went straight in"""
+        loop = asyncio.get_running_loop()
+        return self._enqueue([GradingJob(*job, done=loop.create_future()) for job in jobs])
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self.pending.add(task)
+        task.add_done_callback(self.pending.discard)
+
+    def _enqueue(self, jobs) -> int:
+        """Returns how many jobs are settled or queued without waiting for queue space"""
+        leaders = []
+        for job in jobs:
+            if job.key is None:
+                leaders.append(job)
+                continue
+            cached = self.cache.get(job.key)
+            if cached is not None:
+                self._spawn(self._complete([job], cached))
+            elif job.key in self.inflight:
+                self.inflight[job.key].append(job)
+            else:
+                self.inflight[job.key] = [job]
+                leaders.append(job)
+        for queued, job in enumerate(leaders):
+            try:
+                self.queue.put_nowait(job)
+            except asyncio.QueueFull:
+                # Backpressure: hold the rest outside the queue until slots free
+                # up, but never more than backlog_size jobs
+                rest = leaders[queued:]
+                held = rest[:max(0, self.backlog_size - self.backlog)]
+                for dropped in rest[len(held):]:
+                    self._spawn(self._complete(self.inflight.pop(dropped.key, [dropped]),
+                                               (SubmissionStatus.ERROR, 0)))
+                if held:
+                    self.backlog += len(held)
+                    self._spawn(self._put_all(held))
+                return len(jobs) - len(leaders) + queued
+        return len(jobs)
+
+    async def _put_all(self, jobs):
+        for job in jobs:
+            await self.queue.put(job)
+            self.backlog -= 1
+
+    async def _run(self, pool: ProcessPoolExecutor, job: GradingJob):
+        loop = asyncio.get_running_loop()
+        status, score, job.limited = await asyncio.wait_for(
+            loop.run_in_executor(pool, run_tests, job.challenge_id, job.solution,
+                                 GRADING_CPU_LIMIT, GRADING_MEMORY_LIMIT, GRADING_TIME_LIMIT),
+            GRADING_TIME_LIMIT + GRADING_CPU_LIMIT + GRADING_KILL_GRACE,
+        )
+        return SubmissionStatus(status), score
+
+    async def grade(self, job: GradingJob):
+        """Return (status, score) for one job"""
+        if job.challenge_id not in CHALLENGE_TESTS:
+            return basic_grade(job.solution)
+        pool = self.pool
+        try:
+            return await self._run(pool, job)
+        except BrokenProcessPool:
+            # A run was killed by its hard limit, which fails every run in flight
+            # on that pool. Replace the pool once for later jobs...
+            if self.pool is pool:
+                pool.shutdown(wait=False, cancel_futures=True)
+                self.pool = self._new_pool()
+        except asyncio.TimeoutError:
+            # The run outlived its limits, so it got around them inside the child.
+            # Kill its process (the other runs on the pool are retried below).
+            if self.pool is pool:
+                self.pool = self._new_pool()
+            _kill_pool(pool)
+            return SubmissionStatus.ERROR, 0
+        # ...and retry this job alone in a one-off pool, so only the run that
+        # dies again is an ERROR
+        isolated = self._new_pool(workers=1, max_tasks_per_child=None)
+        try:
+            return await self._run(isolated, job)
+        except (BrokenProcessPool, asyncio.TimeoutError):
+            return SubmissionStatus.ERROR, 0
+        finally:
+            _kill_pool(isolated)
+
+    async def _complete(self, jobs, result):
+        """Write one result back for every job sharing it"""
+        for job in jobs:
+            try:
+                await self.on_result(job.submission_id, *result)
+                outcome = result
+            except asyncio.CancelledError:
+                raise
+            except BaseException:
+                # e.g. the submission was deleted while it was being graded
+                outcome = (SubmissionStatus.ERROR, 0)
+            if not job.done.done():
+                job.done.set_result(outcome)
+
+    async def _worker(self):
+        while True:
+            job = await self.queue.get()
+            try:
+                try:
+                    result = await self.grade(job)
+                except asyncio.CancelledError:
+                    raise
+                except BaseException:
+                    # Whatever one run raises (even SystemExit), the worker task keeps going
+                    result = (SubmissionStatus.ERROR, 0)
+                if job.key is not None and not job.limited and result[0] in CACHEABLE_STATUSES:
+                    self.cache.put(job.key, result)
+                # Followers that joined while this job ran share its result
+                await self._complete(self.inflight.pop(job.key, [job]), result)
+            finally:
+                self.queue.task_done()
@@ -2,13 +2,25 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from datetime import datetime
 import os
+import sys
 from dotenv import load_dotenv
-from models import Challenge, Submission, ChallengeCreate, SubmissionCreate
-from routers import challenges, submissions
 
-# Load environment variables
+# The observability package shared with the Flask app lives at the repository
+# root, which is not on the path when the app is started from fastapi_app/
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+# Load environment variables before the app modules below read their settings
+# (STORAGE_BACKEND, GRADING_*, PROFILE_*, ...) at import time
 load_dotenv()
 
+from models import Challenge, Submission, ChallengeCreate, SubmissionCreate
+from repository import init_storage, close_storage
+from metrics import MetricsMiddleware, metrics_response
+import profiling
+from routers import challenges, leaderboard, submissions
+
 # Create FastAPI app
 app = FastAPI(
     title="UBS Coding Challenge 2025",
@@ -27,9 +39,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if profiling.profiling_enabled():
+    app.add_middleware(profiling.ProfilingMiddleware)
+
+# Outermost, so the timing covers every other middleware too
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(challenges.router, prefix="/api/challenges", tags=["challenges"])
 app.include_router(submissions.router, prefix="/api/submissions", tags=["submissions"])
+app.include_router(leaderboard.router, prefix="/api/leaderboard", tags=["leaderboard"])
+app.include_router(profiling.router, prefix="/api/profiles", tags=["profiles"])
+
+@app.on_event("startup")
+async def startup():
+    await init_storage()
+    await submissions.grader.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await submissions.grader.stop()
+    await close_storage()
 
 @app.get("/")
 async def root():
@@ -39,8 +69,10 @@ async def root():
         "timestamp": datetime.now().isoformat(),
         "endpoints": {
             "health": "/health",
+            "metrics": "/metrics",
             "api_challenges": "/api/challenges",
             "api_submissions": "/api/submissions",
+            "api_leaderboard": "/api/leaderboard",
             "docs": "/docs",
             "redoc": "/redoc"
         }
@@ -55,6 +87,11 @@ async def health_check():
         "service": "fastapi-server"
     }
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics for every route"""
+    return metrics_response()
+
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8000))
@@ -0,0 +1,57 @@
+import time
+
+from fastapi import Response
+
+from observability.metrics import CONTENT_TYPE_LATEST, HTTPMetrics
+
+# Buckets, registry and series are shared with the Flask app (observability/metrics.py)
+METRICS = HTTPMetrics()
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording latency, sizes and in-flight requests.
+
+    Routes are labelled by their path template (read from the scope after
+    routing), so /api/submissions/{submission_id} is one series, not one per id.
+    Streaming responses (SSE) are timed until their last body chunk.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        method = scope["method"]
+        status = 500
+        sent = 0
+
+        async def send_wrapper(message):
+            nonlocal status, sent
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                sent += len(message.get("body", b""))
+            await send(message)
+
+        in_progress = METRICS.in_progress.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_progress.dec()
+            route = scope.get("route")
+            path = route.path if route is not None else "unmatched"
+            METRICS.request_latency.labels(method, path, str(status)).observe(elapsed)
+            METRICS.response_size.labels(method, path).observe(sent)
+            for name, value in scope["headers"]:
+                if name == b"content-length":
+                    METRICS.request_size.labels(method, path).observe(int(value))
+                    break
+
+def metrics_response() -> Response:
+    """Prometheus text exposition, merged across Gunicorn workers via PROMETHEUS_MULTIPROC_DIR"""
+    return Response(METRICS.exposition(), media_type=CONTENT_TYPE_LATEST)
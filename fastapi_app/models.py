@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Dict, Optional, List
 from datetime import datetime
 from enum import Enum
 
@@ -47,6 +47,72 @@ class Submission(SubmissionBase):
     class Config:
         from_attributes = True
 
+class SubmissionSummary(BaseModel):
+    """A submission without its solution code, as listed with include_solution=false"""
+    id: str = Field(..., description="Unique submission identifier")
+    challenge_id: int = Field(..., description="ID of the challenge being solved")
+    status: SubmissionStatus = Field(default=SubmissionStatus.PENDING)
+    submitted_at: datetime
+    score: Optional[int] = Field(None, ge=0, le=100, description="Score percentage")
+
+# Page envelopes for the list endpoints, serialized straight to JSON by pydantic-core
+class ChallengePage(BaseModel):
+    challenges: List[Challenge]
+    total: int
+    limit: int
+    offset: int
+    next_cursor: Optional[str] = None
+    timestamp: str
+
+class SubmissionPage(BaseModel):
+    submissions: List[Submission]
+    total: int
+    limit: int
+    offset: int
+    next_cursor: Optional[str] = None
+    timestamp: str
+
+class SubmissionSummaryPage(BaseModel):
+    submissions: List[SubmissionSummary]
+    total: int
+    limit: int
+    offset: int
+    next_cursor: Optional[str] = None
+    timestamp: str
+
+class SubmissionStats(BaseModel):
+    challenge_id: Optional[int] = Field(None, description="Challenge, or null for all challenges")
+    total: int
+    by_status: Dict[SubmissionStatus, int]
+    acceptance_rate: Optional[float] = Field(None, description="Accepted share of graded submissions")
+    average_score: Optional[float] = Field(None, description="Mean score of scored submissions")
+
+    @classmethod
+    def from_counts(cls, challenge_id: Optional[int], counts: dict) -> "SubmissionStats":
+        """Derive the rates from a repository's running counts"""
+        by_status = counts["by_status"]
+        graded = counts["total"] - by_status[SubmissionStatus.PENDING]
+        return cls(
+            challenge_id=challenge_id,
+            total=counts["total"],
+            by_status=by_status,
+            acceptance_rate=by_status[SubmissionStatus.ACCEPTED] / graded if graded else None,
+            average_score=counts["score_sum"] / counts["scored"] if counts["scored"] else None,
+        )
+
+class LeaderboardEntry(BaseModel):
+    rank: int
+    submission_id: str
+    challenge_id: int
+    score: int
+    status: SubmissionStatus
+    submitted_at: datetime
+
+class Leaderboard(BaseModel):
+    leaderboard: List[LeaderboardEntry]
+    stats: SubmissionStats
+    timestamp: str
+
 class APIResponse(BaseModel):
     message: str
     timestamp: datetime = Field(default_factory=datetime.now)
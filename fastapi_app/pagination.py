@@ -0,0 +1,113 @@
+import base64
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from threading import Lock
+from typing import Hashable, List, Optional, Tuple
+
+from fastapi import HTTPException, Response
+from pydantic import BaseModel
+
+def encode_cursor(key: Optional[int]) -> Optional[str]:
+    """Opaque cursor for the last row of a page (None when there is no next page)"""
+    if key is None:
+        return None
+    return base64.urlsafe_b64encode(f"k:{key}".encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: Optional[str]) -> Optional[int]:
+    """Key encoded by encode_cursor; malformed cursors are a 400"""
+    if cursor is None:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        prefix, key = raw.split(":", 1)
+        if prefix != "k":
+            raise ValueError(raw)
+        return int(key)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+# Serialized list pages kept per process (see PageCache)
+PAGE_CACHE_ENTRIES = int(os.getenv("PAGE_CACHE_ENTRIES", "256"))
+
+def page_response(page: BaseModel, exclude=None) -> Response:
+    """
+    Serialize a page model with pydantic-core in one call.
+
+    Returning a Response skips FastAPI's response_model re-validation and
+    jsonable_encoder walk; the items in a page are already validated models.
+    """
+    return Response(page.model_dump_json(exclude=exclude), media_type="application/json")
+
+def encode_page(items_key: str, items_json: List[bytes], **fields) -> bytes:
+    """
+    A page envelope around items that are already JSON, in the same compact
+    form (and key order) as the page model's model_dump_json.
+    """
+    rest = json.dumps(fields, separators=(",", ":"))[1:].encode() if fields else b"}"
+    return b'{"%s":[%s],%s' % (items_key.encode(), b",".join(items_json), rest)
+
+def page_etag(items_json: List[bytes], **fields) -> str:
+    """
+    Strong ETag over a page's items and envelope fields. The volatile
+    timestamp is left out, so an unchanged page keeps its ETag across renders.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for item in items_json:
+        digest.update(item)
+        digest.update(b"\n")
+    digest.update(json.dumps(fields, sort_keys=True).encode())
+    return f'"{digest.hexdigest()}"'
+
+class PageCache:
+    """
+    Serialized pages with their strong ETags, keyed by the query plus a store version.
+
+    Keys end with the version, so a write (which bumps the version) makes every
+    older page unreachable; those entries are dropped as soon as a newer version
+    is stored. Bounded to `max_entries` with least-recently-used eviction.
+    """
+
+    def __init__(self, max_entries: int = PAGE_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._pages: "OrderedDict[tuple, Tuple[bytes, str]]" = OrderedDict()
+        self._version = None
+        self._lock = Lock()
+
+    def get(self, key: tuple) -> Optional[Tuple[bytes, str]]:
+        with self._lock:
+            entry = self._pages.get(key)
+            if entry is not None:
+                self._pages.move_to_end(key)
+            return entry
+
+    def put(self, key: tuple, body: bytes, etag: str) -> Tuple[bytes, str]:
+        entry = (body, etag)
+        version: Hashable = key[-1]
+        with self._lock:
+            if version != self._version:
+                self._pages.clear()
+                self._version = version
+            self._pages[key] = entry
+            while len(self._pages) > self.max_entries:
+                self._pages.popitem(last=False)
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._pages.clear()
+
+def etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    """Whether an If-None-Match header covers `etag` (weak comparison, as RFC 9110 asks for GET)"""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+def cached_response(body: bytes, etag: str, if_none_match: Optional[str]) -> Response:
+    """200 with the cached bytes, or an empty 304 when the client already has them"""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(etag, if_none_match):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
@@ -0,0 +1,75 @@
+import os
+import tempfile
+import threading
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
+
+from observability import profiling as core
+from observability.profiling import PROFILE_NAME, ProfileRing, StackSampler, profiling_enabled
+
+# Sampler, ring and settings are shared with the Flask app (observability/profiling.py)
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "ubs-profiles-fastapi"))
+# "METHOD path" pairs eligible for profiling
+PROFILE_ROUTES = frozenset(
+    route.strip() for route in
+    os.getenv("PROFILE_ROUTES", "POST /api/submissions/,POST /api/submissions/bulk").split(",")
+)
+
+profile_ring = ProfileRing(PROFILE_DIR)
+
+def _finish(sampler: StackSampler, label: str) -> str:
+    sampler.stop()
+    return profile_ring.write(label, sampler.counts)
+
+class ProfilingMiddleware:
+    """
+    Samples requests to PROFILE_ROUTES that carry the token header or fall in
+    the sample rate. The event loop thread is sampled for the whole request,
+    which is where the app's (all async) endpoints run. main.py only installs
+    it when profiling is enabled, so it costs nothing otherwise.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def _wants_profile(self, scope):
+        if f"{scope['method']} {scope['path']}" not in PROFILE_ROUTES:
+            return False
+        token = next((value.decode("latin-1") for name, value in scope["headers"] if name == b"x-profile"), None)
+        return core.wants_profile(token)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._wants_profile(scope):
+            return await self.app(scope, receive, send)
+        sampler = StackSampler(threading.get_ident()).start()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            # Joining the sampler and writing the file stay off the event loop
+            await run_in_threadpool(_finish, sampler, f"{scope['method']}{scope['path']}")
+
+router = APIRouter()
+
+def _check_token(token):
+    # Profiles expose code paths, so they are only served behind PROFILE_TOKEN
+    if not core.PROFILE_TOKEN:
+        raise HTTPException(status_code=404, detail="Profile downloads need PROFILE_TOKEN")
+    if not core.token_matches(token):
+        raise HTTPException(status_code=403, detail="Missing or wrong X-Profile token")
+
+@router.get("/")
+async def list_profiles(x_profile: str = Header(None)):
+    """Names of the stored profiles, newest first"""
+    _check_token(x_profile)
+    return {"profiles": profile_ring.names()}
+
+@router.get("/{name}")
+async def download_profile(name: str, x_profile: str = Header(None)):
+    """One profile in collapsed-stack format (feed it to flamegraph.pl or speedscope)"""
+    _check_token(x_profile)
+    path = os.path.join(profile_ring.directory, name)
+    if not PROFILE_NAME.match(name) or not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain")
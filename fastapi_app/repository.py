@@ -0,0 +1,315 @@
+import os
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from database import (
+    ChallengeRow, SubmissionRow, create_engine, create_sessionmaker, create_tables,
+)
+from models import (
+    Challenge, ChallengeCreate, DifficultyLevel, SAMPLE_CHALLENGES, Submission, SubmissionStatus,
+)
+from store import ChallengeStore, SubmissionStore
+
+# "memory" keeps everything in this process; "sql" uses DATABASE_URL so every
+# worker shares the same data and it survives restarts.
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "memory")
+
+class MemoryChallengeRepository:
+    """Process-local challenges on the ChallengeStore, seeded with SAMPLE_CHALLENGES"""
+
+    def __init__(self, challenges=SAMPLE_CHALLENGES):
+        self.store = ChallengeStore(challenges)
+
+    @property
+    def version(self) -> int:
+        return self.store.version
+
+    async def get(self, challenge_id: int) -> Optional[Challenge]:
+        return self.store.get(challenge_id)
+
+    async def list(self, difficulty: Optional[DifficultyLevel] = None,
+                   limit: int = 10, offset: int = 0,
+                   after: Optional[int] = None) -> Tuple[List[Challenge], int, Optional[int]]:
+        return self.store.list(difficulty, limit, offset, after)
+
+    async def list_encoded(self, difficulty: Optional[DifficultyLevel] = None,
+                           limit: int = 10, offset: int = 0,
+                           after: Optional[int] = None) -> Tuple[List[bytes], int, Optional[int]]:
+        """Page of pre-encoded challenge JSON straight from the catalog snapshot"""
+        return self.store.list_encoded(difficulty, limit, offset, after)
+
+    async def create(self, challenge: ChallengeCreate) -> Challenge:
+        return self.store.create(challenge)
+
+    async def update(self, challenge_id: int, challenge: ChallengeCreate) -> Optional[Challenge]:
+        return self.store.update(challenge_id, challenge)
+
+    async def delete(self, challenge_id: int) -> bool:
+        return self.store.delete(challenge_id) is not None
+
+class MemorySubmissionRepository:
+    """Process-local submissions on the indexed SubmissionStore"""
+
+    def __init__(self):
+        self.store = SubmissionStore()
+
+    async def get(self, submission_id: str) -> Optional[Submission]:
+        return self.store.get(submission_id)
+
+    async def list(self, challenge_id: Optional[int] = None, status: Optional[SubmissionStatus] = None,
+                   limit: int = 10, offset: int = 0,
+                   after: Optional[int] = None) -> Tuple[List[Submission], int, Optional[int]]:
+        return self.store.list(challenge_id, status, limit, offset, after)
+
+    async def add(self, submission: Submission) -> Submission:
+        return self.store.add(submission)
+
+    async def add_many(self, submissions: List[Submission]) -> List[Submission]:
+        return self.store.add_many(submissions)
+
+    async def update_status(self, submission_id: str, status: SubmissionStatus,
+                            score: Optional[int] = None) -> Optional[Submission]:
+        return self.store.update_status(submission_id, status, score)
+
+    async def delete(self, submission_id: str) -> Optional[Submission]:
+        return self.store.delete(submission_id)
+
+    async def stats(self, challenge_id: Optional[int] = None) -> dict:
+        return self.store.stats(challenge_id)
+
+    async def top(self, limit: int = 10, challenge_id: Optional[int] = None) -> List[Submission]:
+        return self.store.top(limit, challenge_id)
+
+def _row_data(model) -> dict:
+    """Model fields as column values (enums stored by their value)"""
+    data = model.model_dump()
+    for key, value in data.items():
+        if isinstance(value, (DifficultyLevel, SubmissionStatus)):
+            data[key] = value.value
+    return data
+
+def insert_ignoring_duplicates(dialect: str, table):
+    """INSERT that skips rows whose key already exists, in the dialect's own syntax"""
+    if dialect == "sqlite":
+        return sqlite.insert(table).on_conflict_do_nothing()
+    if dialect == "postgresql":
+        return postgresql.insert(table).on_conflict_do_nothing()
+    if dialect == "mysql":
+        return insert(table).prefix_with("IGNORE")
+    return insert(table)
+
+class SQLChallengeRepository:
+    """
+    Challenges in the `challenges` table; one short session per call.
+    Pages seek past the last seen id (`after`) rather than using OFFSET.
+
+    Other workers write to the same table, so there is no process-local
+    `version` to key cached pages on; it is None and pages are never cached.
+    """
+
+    version = None
+
+    def __init__(self, sessionmaker):
+        self.sessionmaker = sessionmaker
+
+    async def seed(self, challenges=SAMPLE_CHALLENGES):
+        """
+        Fill an empty table with the sample challenges. Every worker seeds on
+        startup, so rows another worker inserted after our count are skipped
+        rather than failing the startup on the primary key.
+        """
+        async with self.sessionmaker.begin() as session:
+            if await session.scalar(select(func.count()).select_from(ChallengeRow)):
+                return
+            statement = insert_ignoring_duplicates(session.bind.dialect.name, ChallengeRow)
+            await session.execute(statement, [_row_data(c) for c in challenges])
+
+    async def get(self, challenge_id: int) -> Optional[Challenge]:
+        async with self.sessionmaker() as session:
+            row = await session.get(ChallengeRow, challenge_id)
+            return Challenge.model_validate(row) if row else None
+
+    async def list(self, difficulty: Optional[DifficultyLevel] = None,
+                   limit: int = 10, offset: int = 0,
+                   after: Optional[int] = None) -> Tuple[List[Challenge], int, Optional[int]]:
+        query = select(ChallengeRow)
+        if difficulty:
+            query = query.where(ChallengeRow.difficulty == difficulty.value)
+        async with self.sessionmaker() as session:
+            total = await session.scalar(select(func.count()).select_from(query.subquery()))
+            if after is not None:
+                query = query.where(ChallengeRow.id > after)
+            elif offset:
+                query = query.offset(offset)
+            rows = list(await session.scalars(query.order_by(ChallengeRow.id).limit(limit + 1)))
+            next_after = rows[limit - 1].id if len(rows) > limit else None
+            return [Challenge.model_validate(row) for row in rows[:limit]], total, next_after
+
+    async def list_encoded(self, difficulty: Optional[DifficultyLevel] = None,
+                           limit: int = 10, offset: int = 0,
+                           after: Optional[int] = None) -> Tuple[List[bytes], int, Optional[int]]:
+        challenges, total, next_after = await self.list(difficulty, limit, offset, after)
+        return [c.model_dump_json().encode() for c in challenges], total, next_after
+
+    async def create(self, challenge: ChallengeCreate) -> Challenge:
+        async with self.sessionmaker.begin() as session:
+            row = ChallengeRow(created_at=datetime.now(), **_row_data(challenge))
+            session.add(row)
+            await session.flush()
+            created = Challenge.model_validate(row)
+        return created
+
+    async def update(self, challenge_id: int, challenge: ChallengeCreate) -> Optional[Challenge]:
+        async with self.sessionmaker.begin() as session:
+            row = await session.get(ChallengeRow, challenge_id)
+            if row is None:
+                return None
+            for key, value in _row_data(challenge).items():
+                setattr(row, key, value)
+            updated = Challenge.model_validate(row)
+        return updated
+
+    async def delete(self, challenge_id: int) -> bool:
+        async with self.sessionmaker.begin() as session:
+            row = await session.get(ChallengeRow, challenge_id)
+            if row is None:
+                return False
+            await session.delete(row)
+        return True
+
+class SQLSubmissionRepository:
+    """
+    Submissions in the `submissions` table.
+
+    Pages seek on the `seq` key (`after`) through the filter indexes instead of
+    counting past OFFSET rows; `offset` is still honoured when no key is given.
+    """
+
+    def __init__(self, sessionmaker):
+        self.sessionmaker = sessionmaker
+
+    @staticmethod
+    def _filtered(query, challenge_id, status):
+        if challenge_id is not None:
+            query = query.where(SubmissionRow.challenge_id == challenge_id)
+        if status is not None:
+            query = query.where(SubmissionRow.status == status.value)
+        return query
+
+    async def get(self, submission_id: str) -> Optional[Submission]:
+        async with self.sessionmaker() as session:
+            row = await session.scalar(select(SubmissionRow).where(SubmissionRow.id == submission_id))
+            return Submission.model_validate(row) if row else None
+
+    async def list(self, challenge_id: Optional[int] = None, status: Optional[SubmissionStatus] = None,
+                   limit: int = 10, offset: int = 0,
+                   after: Optional[int] = None) -> Tuple[List[Submission], int, Optional[int]]:
+        async with self.sessionmaker() as session:
+            total = await session.scalar(
+                self._filtered(select(func.count()).select_from(SubmissionRow), challenge_id, status))
+            query = self._filtered(select(SubmissionRow), challenge_id, status)
+            if after is not None:
+                query = query.where(SubmissionRow.seq > after)
+            elif offset:
+                query = query.offset(offset)
+            rows = list(await session.scalars(query.order_by(SubmissionRow.seq).limit(limit + 1)))
+            next_after = rows[limit - 1].seq if len(rows) > limit else None
+            return [Submission.model_validate(row) for row in rows[:limit]], total, next_after
+
+    async def add(self, submission: Submission) -> Submission:
+        async with self.sessionmaker.begin() as session:
+            session.add(SubmissionRow(**_row_data(submission)))
+        return submission
+
+    async def add_many(self, submissions: List[Submission]) -> List[Submission]:
+        """
+        Insert a batch in a single transaction and return the submissions
+        inserted; one whose id is already taken (or repeats earlier in the
+        batch) is skipped.
+        """
+        batch, seen = [], set()
+        for submission in submissions:
+            if submission.id not in seen:
+                seen.add(submission.id)
+                batch.append(submission)
+        if not batch:
+            return []
+        table = SubmissionRow.__table__
+        async with self.sessionmaker.begin() as session:
+            dialect = session.bind.dialect
+            statement = insert_ignoring_duplicates(dialect.name, table).values([_row_data(s) for s in batch])
+            if dialect.insert_returning:
+                inserted = set(await session.scalars(statement.returning(table.c.id)))
+            else:
+                taken = set(await session.scalars(
+                    select(SubmissionRow.id).where(SubmissionRow.id.in_([s.id for s in batch]))))
+                await session.execute(statement)
+                inserted = {s.id for s in batch} - taken
+        return [s for s in batch if s.id in inserted]
+
+    async def update_status(self, submission_id: str, status: SubmissionStatus,
+                            score: Optional[int] = None) -> Optional[Submission]:
+        async with self.sessionmaker.begin() as session:
+            row = await session.scalar(select(SubmissionRow).where(SubmissionRow.id == submission_id))
+            if row is None:
+                return None
+            row.status = status.value
+            if score is not None:
+                row.score = score
+            return Submission.model_validate(row)
+
+    async def delete(self, submission_id: str) -> Optional[Submission]:
+        async with self.sessionmaker.begin() as session:
+            row = await session.scalar(select(SubmissionRow).where(SubmissionRow.id == submission_id))
+            if row is None:
+                return None
+            await session.delete(row)
+            return Submission.model_validate(row)
+
+    async def stats(self, challenge_id: Optional[int] = None) -> dict:
+        """Counts per status plus score sum/count, from one grouped query"""
+        query = self._filtered(
+            select(SubmissionRow.status, func.count(), func.count(SubmissionRow.score),
+                   func.coalesce(func.sum(SubmissionRow.score), 0)),
+            challenge_id, None).group_by(SubmissionRow.status)
+        counts = {"total": 0, "by_status": {status: 0 for status in SubmissionStatus},
+                  "scored": 0, "score_sum": 0}
+        async with self.sessionmaker() as session:
+            for status, total, scored, score_sum in await session.execute(query):
+                counts["by_status"][SubmissionStatus(status)] = total
+                counts["total"] += total
+                counts["scored"] += scored
+                counts["score_sum"] += score_sum
+        return counts
+
+    async def top(self, limit: int = 10, challenge_id: Optional[int] = None) -> List[Submission]:
+        query = self._filtered(select(SubmissionRow), challenge_id, None).where(SubmissionRow.score.is_not(None))
+        async with self.sessionmaker() as session:
+            rows = await session.scalars(
+                query.order_by(SubmissionRow.score.desc(), SubmissionRow.seq).limit(limit))
+            return [Submission.model_validate(row) for row in rows]
+
+engine = None
+if STORAGE_BACKEND == "sql":
+    engine = create_engine()
+    sessionmaker = create_sessionmaker(engine)
+    challenge_repo = SQLChallengeRepository(sessionmaker)
+    submission_repo = SQLSubmissionRepository(sessionmaker)
+elif STORAGE_BACKEND == "memory":
+    challenge_repo = MemoryChallengeRepository()
+    submission_repo = MemorySubmissionRepository()
+else:
+    raise ValueError(f"Unknown STORAGE_BACKEND: {STORAGE_BACKEND}")
+
+async def init_storage():
+    """Create tables and seed sample challenges (no-op for the memory backend)"""
+    if engine is not None:
+        await create_tables(engine)
+        await challenge_repo.seed()
+
+async def close_storage():
+    if engine is not None:
+        await engine.dispose()
@@ -1,87 +1,94 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
-from models import Challenge, ChallengeCreate, SAMPLE_CHALLENGES, DifficultyLevel
+from models import Challenge, ChallengeCreate, ChallengePage, DifficultyLevel, SubmissionStats
+from repository import challenge_repo, submission_repo
+from events import event_hub, event_stream
+from pagination import PageCache, cached_response, encode_cursor, decode_cursor, encode_page, page_etag
 from datetime import datetime
 
 router = APIRouter()
 
-# In-memory storage for development (use database in production)
-challenges_db = {challenge.id: challenge for challenge in SAMPLE_CHALLENGES}
+# Serialized list pages, invalidated by challenge_repo.version (memory backend only)
+page_cache = PageCache()
 
-@router.get("/", response_model=dict)
+@router.get("/", response_model=ChallengePage)
 async def get_challenges(
+    request: Request,
     difficulty: Optional[DifficultyLevel] = Query(None, description="Filter by difficulty"),
     limit: int = Query(10, ge=1, le=100, description="Number of challenges to return"),
-    offset: int = Query(0, ge=0, description="Number of challenges to skip")
+    offset: int = Query(0, ge=0, description="Number of challenges to skip"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (overrides offset)")
 ):
     """Get all challenges with optional filtering"""
-    all_challenges = list(challenges_db.values())
+    # The version is read first: a write racing with the query can only make
+    # the cached page newer than its key, never older. A None version (SQL
+    # backend, written by every worker) means pages are not cached.
+    version = challenge_repo.version
+    key = (difficulty, limit, offset, cursor, version)
+    cached = page_cache.get(key) if version is not None else None
+    if cached is None:
+        # Items come pre-encoded from the catalog snapshot; only the envelope is new
+        challenges, total, next_after = await challenge_repo.list_encoded(
+            difficulty, limit, offset, after=decode_cursor(cursor))
+        fields = dict(total=total, limit=limit, offset=offset, next_cursor=encode_cursor(next_after))
+        body = encode_page("challenges", challenges, **fields, timestamp=datetime.now().isoformat())
+        cached = (body, page_etag(challenges, **fields))
+        if version is not None:
+            page_cache.put(key, *cached)
     
-    # Filter by difficulty if specified
-    if difficulty:
-        all_challenges = [c for c in all_challenges if c.difficulty == difficulty]
-    
-    # Apply pagination
-    total = len(all_challenges)
-    challenges = all_challenges[offset:offset + limit]
-    
-    return {
-        "challenges": challenges,
-        "total": total,
-        "limit": limit,
-        "offset": offset,
-        "timestamp": datetime.now().isoformat()
-    }
+    return cached_response(*cached, request.headers.get("if-none-match"))
 
 @router.get("/{challenge_id}", response_model=Challenge)
 async def get_challenge(challenge_id: int):
     """Get a specific challenge by ID"""
-    if challenge_id not in challenges_db:
+    challenge = await challenge_repo.get(challenge_id)
+    if challenge is None:
+        raise HTTPException(status_code=404, detail="Challenge not found")
+    
+    return challenge
+
+@router.get("/{challenge_id}/stats", response_model=SubmissionStats)
+async def get_challenge_stats(challenge_id: int):
+    """Submission counts per status, acceptance rate and average score for a challenge"""
+    if await challenge_repo.get(challenge_id) is None:
         raise HTTPException(status_code=404, detail="Challenge not found")
     
-    return challenges_db[challenge_id]
+    return SubmissionStats.from_counts(challenge_id, await submission_repo.stats(challenge_id))
+
+@router.get("/{challenge_id}/events")
+async def challenge_events(challenge_id: int):
+    """Stream every new submission and status change for this challenge as server-sent events"""
+    if await challenge_repo.get(challenge_id) is None:
+        raise HTTPException(status_code=404, detail="Challenge not found")
+
+    async def stream():
+        with event_hub.subscription(("challenge", challenge_id)) as queue:
+            async for frame in event_stream(queue):
+                yield frame
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 @router.post("/", response_model=Challenge, status_code=201)
 async def create_challenge(challenge: ChallengeCreate):
     """Create a new challenge"""
-    # Generate new ID
-    new_id = max(challenges_db.keys()) + 1 if challenges_db else 1
-    
-    new_challenge = Challenge(
-        id=new_id,
-        name=challenge.name,
-        difficulty=challenge.difficulty,
-        points=challenge.points,
-        description=challenge.description,
-        created_at=datetime.now()
-    )
-    
-    challenges_db[new_id] = new_challenge
-    return new_challenge
+    return await challenge_repo.create(challenge)
 
 @router.put("/{challenge_id}", response_model=Challenge)
 async def update_challenge(challenge_id: int, challenge: ChallengeCreate):
     """Update an existing challenge"""
-    if challenge_id not in challenges_db:
+    updated_challenge = await challenge_repo.update(challenge_id, challenge)
+    if updated_challenge is None:
         raise HTTPException(status_code=404, detail="Challenge not found")
     
-    updated_challenge = Challenge(
-        id=challenge_id,
-        name=challenge.name,
-        difficulty=challenge.difficulty,
-        points=challenge.points,
-        description=challenge.description,
-        created_at=challenges_db[challenge_id].created_at
-    )
-    
-    challenges_db[challenge_id] = updated_challenge
     return updated_challenge
 
 @router.delete("/{challenge_id}")
 async def delete_challenge(challenge_id: int):
     """Delete a challenge"""
-    if challenge_id not in challenges_db:
+    if not await challenge_repo.delete(challenge_id):
         raise HTTPException(status_code=404, detail="Challenge not found")
+    event_hub.close(("challenge", challenge_id))
     
-    del challenges_db[challenge_id]
     return {"message": f"Challenge {challenge_id} deleted successfully"}
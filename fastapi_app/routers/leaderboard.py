@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Query
+from typing import Optional
+from models import Leaderboard, LeaderboardEntry, SubmissionStats
+from repository import submission_repo
+from datetime import datetime
+
+router = APIRouter()
+
+@router.get("/", response_model=Leaderboard)
+async def get_leaderboard(
+    challenge_id: Optional[int] = Query(None, description="Rank one challenge only"),
+    limit: int = Query(10, ge=1, le=100, description="Number of entries to return")
+):
+    """Highest-scoring submissions, read from the running ranking"""
+    top = await submission_repo.top(limit, challenge_id)
+    
+    return Leaderboard(
+        leaderboard=[
+            LeaderboardEntry(rank=rank, submission_id=s.id, challenge_id=s.challenge_id,
+                             score=s.score, status=s.status, submitted_at=s.submitted_at)
+            for rank, s in enumerate(top, 1)
+        ],
+        stats=SubmissionStats.from_counts(challenge_id, await submission_repo.stats(challenge_id)),
+        timestamp=datetime.now().isoformat()
+    )
@@ -1,57 +1,117 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional
-from models import Submission, SubmissionCreate, SubmissionStatus
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter, ValidationError
+from typing import List, Optional, Union
+from models import Submission, SubmissionCreate, SubmissionPage, SubmissionStatus, SubmissionSummaryPage
+from repository import submission_repo
+from grading import Grader, GRADING_INLINE_WAIT
+from pagination import encode_cursor, decode_cursor, page_response
+from events import event_hub, event_stream
 from datetime import datetime
+import asyncio
+import json
+import os
 import uuid
 
 router = APIRouter()
 
-# In-memory storage for development (use database in production)
-submissions_db = {}
+# Largest batch accepted by POST /bulk
+BULK_MAX_SUBMISSIONS = int(os.getenv("BULK_MAX_SUBMISSIONS", "1000"))
+NDJSON_TYPES = ("application/x-ndjson", "application/jsonl")
 
-@router.get("/", response_model=dict)
+submission_list = TypeAdapter(List[SubmissionCreate])
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+# Seconds a client is asked to wait when the grading queue and backlog are full
+GRADING_RETRY_AFTER = "5"
+
+def publish_submission(submission: Submission):
+    """Tell watchers of the submission and of its challenge about its current state"""
+    data = submission.model_dump_json(exclude={"solution"})
+    event_hub.publish(("submission", submission.id), data)
+    event_hub.publish(("challenge", submission.challenge_id), data)
+
+def new_submission_id(now: datetime) -> str:
+    return f"sub_{uuid.uuid4().hex[:8]}_{now.strftime('%Y%m%d_%H%M%S')}"
+
+def is_graded(data: str) -> bool:
+    return json.loads(data)["status"] != SubmissionStatus.PENDING.value
+
+async def set_submission_status(submission_id: str, status: SubmissionStatus,
+                                score: Optional[int] = None) -> Optional[Submission]:
+    """Single write path for status/score, used by the API and the grader"""
+    submission = await submission_repo.update_status(submission_id, status, score)
+    if submission is not None:
+        publish_submission(submission)
+    return submission
+
+# Started and stopped with the app (see main.py)
+grader = Grader(on_result=set_submission_status)
+
+def check_grading_room(jobs: int = 1):
+    """Refuse new work up front instead of storing submissions the grader cannot take"""
+    if not grader.has_room(jobs):
+        raise HTTPException(status_code=503, detail="Grading queue is full, retry later",
+                            headers={"Retry-After": GRADING_RETRY_AFTER})
+
+# Documents both shapes; the page itself is always a SubmissionPage with the
+# solutions excluded on serialization (see page_response)
+@router.get("/", response_model=Union[SubmissionPage, SubmissionSummaryPage])
 async def get_submissions(
     challenge_id: Optional[int] = Query(None, description="Filter by challenge ID"),
     status: Optional[SubmissionStatus] = Query(None, description="Filter by status"),
     limit: int = Query(10, ge=1, le=100, description="Number of submissions to return"),
-    offset: int = Query(0, ge=0, description="Number of submissions to skip")
+    offset: int = Query(0, ge=0, description="Number of submissions to skip"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (overrides offset)"),
+    include_solution: bool = Query(True, description="Include each submission's solution code")
 ):
     """Get all submissions with optional filtering"""
-    all_submissions = list(submissions_db.values())
-    
-    # Filter by challenge_id if specified
-    if challenge_id:
-        all_submissions = [s for s in all_submissions if s.challenge_id == challenge_id]
-    
-    # Filter by status if specified
-    if status:
-        all_submissions = [s for s in all_submissions if s.status == status]
+    submissions, total, next_after = await submission_repo.list(
+        challenge_id, status, limit, offset, after=decode_cursor(cursor))
     
-    # Apply pagination
-    total = len(all_submissions)
-    submissions = all_submissions[offset:offset + limit]
-    
-    return {
-        "submissions": submissions,
-        "total": total,
-        "limit": limit,
-        "offset": offset,
-        "timestamp": datetime.now().isoformat()
-    }
+    page = SubmissionPage.model_construct(
+        submissions=submissions,
+        total=total,
+        limit=limit,
+        offset=offset,
+        next_cursor=encode_cursor(next_after),
+        timestamp=datetime.now().isoformat()
+    )
+    return page_response(page, exclude=None if include_solution else {"submissions": {"__all__": {"solution"}}})
 
 @router.get("/{submission_id}", response_model=Submission)
 async def get_submission(submission_id: str):
     """Get a specific submission by ID"""
-    if submission_id not in submissions_db:
+    submission = await submission_repo.get(submission_id)
+    if submission is None:
         raise HTTPException(status_code=404, detail="Submission not found")
     
-    return submissions_db[submission_id]
+    return submission
+
+@router.get("/{submission_id}/events")
+async def submission_events(submission_id: str):
+    """Stream the submission's state as server-sent events until it has been graded"""
+    if await submission_repo.get(submission_id) is None:
+        raise HTTPException(status_code=404, detail="Submission not found")
+
+    async def stream():
+        with event_hub.subscription(("submission", submission_id)) as queue:
+            # Read the state only once subscribed, so no change can slip in between
+            current = await submission_repo.get(submission_id)
+            if current is None:
+                return
+            async for frame in event_stream(queue, current.model_dump_json(exclude={"solution"}), is_graded):
+                yield frame
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers=SSE_HEADERS)
 
 @router.post("/", response_model=Submission, status_code=201)
-async def create_submission(submission: SubmissionCreate):
+async def create_submission(submission: SubmissionCreate, response: Response):
     """Submit a solution for a challenge"""
+    check_grading_room()
     # Generate unique submission ID
-    submission_id = f"sub_{uuid.uuid4().hex[:8]}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    submission_id = new_submission_id(datetime.now())
     
     new_submission = Submission(
         id=submission_id,
@@ -60,24 +120,106 @@ async def create_submission(submission: SubmissionCreate):
         status=SubmissionStatus.PENDING,
         submitted_at=datetime.now()
     )
+    await submission_repo.add(new_submission)
+    publish_submission(new_submission)
     
-    # Here you would typically:
-    # 1. Validate the solution
-    # 2. Run tests against the solution
-    # 3. Calculate score
-    # For now, we'll simulate this with a simple check
-    
-    # Simulate processing delay and scoring
-    if len(submission.solution.strip()) > 10:  # Basic validation
-        new_submission.status = SubmissionStatus.ACCEPTED
-        new_submission.score = 85  # Simulated score
-    else:
-        new_submission.status = SubmissionStatus.REJECTED
-        new_submission.score = 0
-    
-    submissions_db[submission_id] = new_submission
+    # Grading runs the solution against the challenge's test cases in a
+    # worker process. Wait briefly so quick runs still answer 201 with the
+    # final status; under load (or a full queue) answer 202 while PENDING
+    # and let the grader write the result back later.
+    done = grader.submit(submission_id, submission.challenge_id, submission.solution) if grader.running else None
+    if done is not None:
+        try:
+            await asyncio.wait_for(done, GRADING_INLINE_WAIT)
+            new_submission = await submission_repo.get(submission_id) or new_submission
+        except asyncio.TimeoutError:
+            pass
+    if new_submission.status == SubmissionStatus.PENDING:
+        response.status_code = 202
     return new_submission
 
+def _parse_bulk_body(body: bytes, content_type: str):
+    """Items from a JSON array or NDJSON body, plus {index: error} for NDJSON lines that aren't JSON"""
+    if content_type.split(";")[0].strip() in NDJSON_TYPES:
+        items, errors = [], {}
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                errors[len(items)] = "Invalid JSON"
+                items.append(None)
+        return items, errors
+    try:
+        items = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Expected a JSON array of submissions")
+    return items, {}
+
+def _validate_bulk(items, errors):
+    """Validate the whole batch in one pass; on failure re-validate only the clean items"""
+    candidates = [i for i in range(len(items)) if i not in errors]
+    try:
+        return candidates, submission_list.validate_python([items[i] for i in candidates])
+    except ValidationError as exc:
+        for error in exc.errors():
+            index = candidates[error["loc"][0]]
+            field = ".".join(str(part) for part in error["loc"][1:])
+            errors.setdefault(index, f"{field}: {error['msg']}" if field else error["msg"])
+    valid = [i for i in candidates if i not in errors]
+    return valid, submission_list.validate_python([items[i] for i in valid])
+
+@router.post("/bulk", status_code=202)
+async def create_submissions_bulk(request: Request):
+    """Submit many solutions at once (JSON array or NDJSON); grading is queued for all of them"""
+    items, errors = _parse_bulk_body(await request.body(), request.headers.get("content-type", ""))
+    if len(items) > BULK_MAX_SUBMISSIONS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_SUBMISSIONS} submissions per request")
+    valid, creates = _validate_bulk(items, errors)
+    check_grading_room(len(creates))
+
+    now = datetime.now()
+    new_submissions = [
+        Submission(
+            id=new_submission_id(now),
+            challenge_id=create.challenge_id,
+            solution=create.solution,
+            status=SubmissionStatus.PENDING,
+            submitted_at=now
+        )
+        for create in creates
+    ]
+    ids = {}
+    if new_submissions:
+        stored = {s.id for s in await submission_repo.add_many(new_submissions)}
+        accepted = []
+        for index, new_submission in zip(valid, new_submissions):
+            if new_submission.id in stored:
+                stored.discard(new_submission.id)  # a repeat later in the batch was skipped
+                ids[index] = new_submission.id
+                accepted.append(new_submission)
+            else:
+                # The generated id was already taken; only this item has to be resubmitted
+                errors[index] = "Submission id collision, please resubmit"
+        for new_submission in accepted:
+            publish_submission(new_submission)
+        if grader.running:
+            grader.submit_many((s.id, s.challenge_id, s.solution) for s in accepted)
+
+    results = [
+        {"index": i, "id": ids[i]} if i in ids else {"index": i, "error": errors[i]}
+        for i in range(len(items))
+    ]
+    return {
+        "results": results,
+        "accepted": len(ids),
+        "rejected": len(errors),
+        "timestamp": now.isoformat()
+    }
+
 @router.put("/{submission_id}/status", response_model=Submission)
 async def update_submission_status(
     submission_id: str, 
@@ -85,21 +227,18 @@ async def update_submission_status(
     score: Optional[int] = Query(None, ge=0, le=100, description="Score percentage")
 ):
     """Update submission status and score"""
-    if submission_id not in submissions_db:
+    submission = await set_submission_status(submission_id, status, score)
+    if submission is None:
         raise HTTPException(status_code=404, detail="Submission not found")
     
-    submission = submissions_db[submission_id]
-    submission.status = status
-    if score is not None:
-        submission.score = score
-    
     return submission
 
 @router.delete("/{submission_id}")
 async def delete_submission(submission_id: str):
     """Delete a submission"""
-    if submission_id not in submissions_db:
+    if await submission_repo.delete(submission_id) is None:
         raise HTTPException(status_code=404, detail="Submission not found")
+    # Watchers of a pending submission would otherwise wait for a verdict forever
+    event_hub.close(("submission", submission_id))
     
-    del submissions_db[submission_id]
     return {"message": f"Submission {submission_id} deleted successfully"}
@@ -0,0 +1,308 @@
+from bisect import bisect_left, bisect_right, insort
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import count
+from threading import RLock
+from types import MappingProxyType
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from models import Challenge, ChallengeCreate, DifficultyLevel, Submission, SubmissionStatus
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """
+    Immutable view of the challenge catalog: ids in order, one sorted id tuple
+    per difficulty, and every challenge with its JSON already encoded.
+    """
+    version: int
+    ids: Tuple[int, ...]
+    buckets: Mapping[DifficultyLevel, Tuple[int, ...]]
+    items: Mapping[int, Challenge]
+    encoded: Mapping[int, bytes]
+
+    @classmethod
+    def build(cls, version: int, items: Dict[int, Challenge], encoded: Dict[int, bytes]):
+        ids = tuple(sorted(items))
+        buckets = {level: [] for level in DifficultyLevel}
+        for challenge_id in ids:
+            buckets[items[challenge_id].difficulty].append(challenge_id)
+        return cls(version, ids, MappingProxyType({level: tuple(b) for level, b in buckets.items()}),
+                   MappingProxyType(items), MappingProxyType(encoded))
+
+class ChallengeStore:
+    """
+    In-memory challenge storage behind a copy-on-write CatalogSnapshot.
+
+    Readers grab the current snapshot (one attribute read) and never lock; a
+    filtered page is a slice of one difficulty tuple and the items come with
+    their JSON pre-encoded. Writers hold the lock, copy the snapshot with the
+    one change applied (encoding only the changed challenge) and publish it,
+    so each write is atomic between coroutines and threadpool workers alike.
+    Ids come from a monotonic sequence and are never reused after a delete.
+    """
+
+    def __init__(self, challenges: Iterable[Challenge] = ()):
+        self._lock = RLock()
+        items = {challenge.id: challenge for challenge in challenges}
+        encoded = {challenge_id: c.model_dump_json().encode() for challenge_id, c in items.items()}
+        self._snapshot = CatalogSnapshot.build(0, items, encoded)
+        self._ids = count(max(items) + 1 if items else 1)
+
+    @property
+    def snapshot(self) -> CatalogSnapshot:
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    def __len__(self):
+        return len(self._snapshot.ids)
+
+    def __contains__(self, challenge_id):
+        return challenge_id in self._snapshot.items
+
+    def _publish(self, challenge_id: int, challenge: Optional[Challenge]):
+        # Caller holds the lock; None removes the challenge
+        old = self._snapshot
+        items, encoded = dict(old.items), dict(old.encoded)
+        if challenge is None:
+            del items[challenge_id], encoded[challenge_id]
+        else:
+            items[challenge_id] = challenge
+            encoded[challenge_id] = challenge.model_dump_json().encode()
+        self._snapshot = CatalogSnapshot.build(old.version + 1, items, encoded)
+
+    def get(self, challenge_id: int) -> Optional[Challenge]:
+        return self._snapshot.items.get(challenge_id)
+
+    def create(self, challenge: ChallengeCreate) -> Challenge:
+        with self._lock:
+            new_challenge = Challenge(id=next(self._ids), created_at=datetime.now(), **challenge.model_dump())
+            self._publish(new_challenge.id, new_challenge)
+            return new_challenge
+
+    def modify(self, challenge_id: int,
+               change: Callable[[Challenge], Challenge]) -> Optional[Challenge]:
+        """
+        Atomically replace a challenge with `change(current)`.
+
+        `change` runs under the store lock, so it sees the latest value and no
+        other write can interleave; it must be synchronous and keep the id.
+        """
+        with self._lock:
+            current = self._snapshot.items.get(challenge_id)
+            if current is None:
+                return None
+            updated = change(current)
+            if updated.id != challenge_id:
+                raise ValueError("A challenge's id cannot change")
+            self._publish(challenge_id, updated)
+            return updated
+
+    def update(self, challenge_id: int, challenge: ChallengeCreate) -> Optional[Challenge]:
+        """Replace every editable field, keeping id and created_at"""
+        return self.modify(challenge_id, lambda current: Challenge(
+            id=challenge_id, created_at=current.created_at, **challenge.model_dump()))
+
+    def delete(self, challenge_id: int) -> Optional[Challenge]:
+        with self._lock:
+            challenge = self._snapshot.items.get(challenge_id)
+            if challenge is not None:
+                self._publish(challenge_id, None)
+            return challenge
+
+    def _page(self, difficulty, limit, offset, after):
+        snapshot = self._snapshot
+        ids = snapshot.ids if difficulty is None else snapshot.buckets[difficulty]
+        start = offset if after is None else bisect_right(ids, after)
+        page = ids[start:start + limit]
+        next_after = page[-1] if page and start + limit < len(ids) else None
+        return snapshot, page, len(ids), next_after
+
+    def list(self, difficulty: Optional[DifficultyLevel] = None,
+             limit: int = 10, offset: int = 0,
+             after: Optional[int] = None) -> Tuple[List[Challenge], int, Optional[int]]:
+        """One page in id order, the filtered total, and the `after` key for the next page"""
+        snapshot, page, total, next_after = self._page(difficulty, limit, offset, after)
+        return [snapshot.items[i] for i in page], total, next_after
+
+    def list_encoded(self, difficulty: Optional[DifficultyLevel] = None,
+                     limit: int = 10, offset: int = 0,
+                     after: Optional[int] = None) -> Tuple[List[bytes], int, Optional[int]]:
+        """Same page as `list`, as each challenge's pre-encoded JSON"""
+        snapshot, page, total, next_after = self._page(difficulty, limit, offset, after)
+        return [snapshot.encoded[i] for i in page], total, next_after
+
+class SubmissionStore:
+    """
+    In-memory submission storage with secondary indexes.
+
+    Every submission gets a monotonically increasing sequence number on insert.
+    Each index (all, per challenge, per status, per challenge+status) is a
+    sorted list of those numbers, so a filtered page is a direct slice of one
+    list: O(limit) to read, with the total count being the list's length.
+
+    Scored submissions are also aggregated per challenge and overall (key
+    None): a running score sum and count, and a ranking list sorted by
+    (-score, seq), so statistics and the top N are read without a scan.
+    """
+
+    def __init__(self):
+        self._lock = RLock()
+        self._seq = count()
+        self._items: Dict[int, Submission] = {}   # seq -> submission
+        self._seq_of: Dict[str, int] = {}          # submission id -> seq
+        self._all: List[int] = []
+        self._indexes: Dict[tuple, List[int]] = {}
+        self._score_sum: Dict[Optional[int], int] = {}
+        self._scored: Dict[Optional[int], int] = {}
+        self._ranked: Dict[Optional[int], List[Tuple[int, int]]] = {}
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, submission_id):
+        return submission_id in self._seq_of
+
+    def _keys(self, submission: Submission):
+        return (
+            ("challenge", submission.challenge_id),
+            ("status", submission.status),
+            ("challenge_status", submission.challenge_id, submission.status),
+        )
+
+    def _index_add(self, key, seq):
+        # Appends in the common case: new submissions carry the largest seq
+        seqs = self._indexes.setdefault(key, [])
+        if not seqs or seqs[-1] < seq:
+            seqs.append(seq)
+        else:
+            insort(seqs, seq)
+
+    def _index_remove(self, key, seq):
+        seqs = self._indexes[key]
+        del seqs[bisect_left(seqs, seq)]
+        if not seqs:
+            del self._indexes[key]
+
+    def _score_add(self, submission: Submission, seq: int):
+        if submission.score is None:
+            return
+        for key in (None, submission.challenge_id):
+            self._score_sum[key] = self._score_sum.get(key, 0) + submission.score
+            self._scored[key] = self._scored.get(key, 0) + 1
+            insort(self._ranked.setdefault(key, []), (-submission.score, seq))
+
+    def _score_remove(self, submission: Submission, seq: int):
+        if submission.score is None:
+            return
+        for key in (None, submission.challenge_id):
+            self._score_sum[key] -= submission.score
+            self._scored[key] -= 1
+            ranked = self._ranked[key]
+            del ranked[bisect_left(ranked, (-submission.score, seq))]
+
+    def _select(self, challenge_id: Optional[int], status: Optional[SubmissionStatus]) -> List[int]:
+        if challenge_id is not None and status is not None:
+            key = ("challenge_status", challenge_id, status)
+        elif challenge_id is not None:
+            key = ("challenge", challenge_id)
+        elif status is not None:
+            key = ("status", status)
+        else:
+            return self._all
+        return self._indexes.get(key, [])
+
+    def get(self, submission_id: str) -> Optional[Submission]:
+        seq = self._seq_of.get(submission_id)
+        return None if seq is None else self._items.get(seq)
+
+    def add(self, submission: Submission) -> Submission:
+        if not self.add_many([submission]):
+            raise KeyError(f"Duplicate submission id: {submission.id}")
+        return submission
+
+    def add_many(self, submissions: List[Submission]) -> List[Submission]:
+        """
+        Insert a batch under one lock and return the submissions inserted;
+        one whose id is already taken (or repeats earlier in the batch) is skipped.
+        """
+        inserted = []
+        with self._lock:
+            for submission in submissions:
+                if submission.id in self._seq_of:
+                    continue
+                inserted.append(submission)
+                seq = next(self._seq)
+                self._items[seq] = submission
+                self._seq_of[submission.id] = seq
+                self._all.append(seq)
+                for key in self._keys(submission):
+                    self._index_add(key, seq)
+                self._score_add(submission, seq)
+        return inserted
+
+    def update_status(self, submission_id: str, status: SubmissionStatus,
+                      score: Optional[int] = None) -> Optional[Submission]:
+        """Set status (and score, if given), moving the submission between status indexes"""
+        with self._lock:
+            seq = self._seq_of.get(submission_id)
+            if seq is None:
+                return None
+            submission = self._items[seq]
+            if submission.status != status:
+                for key in self._keys(submission)[1:]:
+                    self._index_remove(key, seq)
+                submission.status = status
+                for key in self._keys(submission)[1:]:
+                    self._index_add(key, seq)
+            if score is not None and score != submission.score:
+                self._score_remove(submission, seq)
+                submission.score = score
+                self._score_add(submission, seq)
+            return submission
+
+    def delete(self, submission_id: str) -> Optional[Submission]:
+        with self._lock:
+            seq = self._seq_of.pop(submission_id, None)
+            if seq is None:
+                return None
+            submission = self._items.pop(seq)
+            del self._all[bisect_left(self._all, seq)]
+            for key in self._keys(submission):
+                self._index_remove(key, seq)
+            self._score_remove(submission, seq)
+            return submission
+
+    def list(self, challenge_id: Optional[int] = None, status: Optional[SubmissionStatus] = None,
+             limit: int = 10, offset: int = 0,
+             after: Optional[int] = None) -> Tuple[List[Submission], int, Optional[int]]:
+        """
+        One page of submissions in insertion order, the filtered total, and the
+        key to pass as `after` for the next page (None on the last page).
+        `after` seeks by binary search and takes precedence over `offset`.
+        """
+        with self._lock:
+            seqs = self._select(challenge_id, status)
+            start = offset if after is None else bisect_right(seqs, after)
+            page = seqs[start:start + limit]
+            next_after = page[-1] if page and start + limit < len(seqs) else None
+            items = self._items
+            return [items[seq] for seq in page], len(seqs), next_after
+
+    def stats(self, challenge_id: Optional[int] = None) -> dict:
+        """Counts per status plus score sum/count, for one challenge or (None) all of them"""
+        with self._lock:
+            return {
+                "total": len(self._select(challenge_id, None)),
+                "by_status": {status: len(self._select(challenge_id, status)) for status in SubmissionStatus},
+                "scored": self._scored.get(challenge_id, 0),
+                "score_sum": self._score_sum.get(challenge_id, 0),
+            }
+
+    def top(self, limit: int = 10, challenge_id: Optional[int] = None) -> List[Submission]:
+        """Highest scores first; equal scores in submission order"""
+        with self._lock:
+            items = self._items
+            return [items[seq] for _, seq in self._ranked.get(challenge_id, [])[:limit]]
@@ -5,16 +5,25 @@ from flask.logging import create_logger
 import os
 from dotenv import load_dotenv
 from datetime import datetime
-from flask_app.routes import api_bp
 
+# Load .env before the modules below read their settings at import time
 load_dotenv()
 
+from flask_app.routes import api_bp
+from flask_app.metrics import init_metrics
+from flask_app.profiling import init_profiling
+from flask_app.ticketing import configured_backend
+
 def create_app():
     app = Flask(__name__)
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key')
     app.config['DEBUG'] = os.getenv('DEBUG', 'False').lower() == 'true'
+    # Fail at startup, not on every request, when the backend name is wrong
+    app.config['TICKETING_BACKEND'] = configured_backend()
 
     app.register_blueprint(api_bp, url_prefix='/api')
+    init_metrics(app)
+    init_profiling(app)
 
     @app.route('/')
     def home():
@@ -24,6 +33,7 @@ def create_app():
             'endpoints': {
                 'health': '/health',
                 'api': '/api/',
+                'metrics': '/metrics',
                 'docs': 'No built-in docs (consider FastAPI for auto-docs)'
             }
         })
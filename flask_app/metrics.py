@@ -0,0 +1,43 @@
+# flask_app/metrics.py
+import time
+
+from flask import Response, g, request
+
+from observability.metrics import CONTENT_TYPE_LATEST, HTTPMetrics
+
+# Buckets, registry and series are shared with the FastAPI app (observability/metrics.py)
+METRICS = HTTPMetrics()
+
+def _route():
+    # The URL rule template keeps one series per endpoint, not one per URL
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+def _before():
+    METRICS.in_progress.labels(request.method).inc()
+    g.metrics_start = time.perf_counter()
+
+def _after(response):
+    elapsed = time.perf_counter() - g.metrics_start
+    route = _route()
+    METRICS.request_latency.labels(request.method, route, str(response.status_code)).observe(elapsed)
+    if request.content_length is not None:
+        METRICS.request_size.labels(request.method, route).observe(request.content_length)
+    if response.content_length is not None:  # streamed bodies have no length up front
+        METRICS.response_size.labels(request.method, route).observe(response.content_length)
+    return response
+
+def _teardown(exc):
+    # Runs even when a handler raised, so the gauge cannot leak
+    if 'metrics_start' in g:
+        METRICS.in_progress.labels(request.method).dec()
+
+def metrics():
+    """Prometheus text exposition, merged across Gunicorn workers via PROMETHEUS_MULTIPROC_DIR"""
+    return Response(METRICS.exposition(), mimetype=CONTENT_TYPE_LATEST)
+
+def init_metrics(app):
+    """Register the timing hooks and the /metrics endpoint on a Flask app"""
+    app.before_request(_before)
+    app.after_request(_after)
+    app.teardown_request(_teardown)
+    app.add_url_rule('/metrics', 'metrics', metrics)
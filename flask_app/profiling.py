@@ -0,0 +1,56 @@
+# flask_app/profiling.py
+import functools
+import os
+import tempfile
+import threading
+
+from flask import abort, jsonify, request, send_from_directory
+
+from observability import profiling as core
+from observability.profiling import PROFILE_NAME, ProfileRing, StackSampler
+
+# Sampler, ring and settings are shared with the FastAPI app (observability/profiling.py)
+PROFILE_DIR = os.getenv('PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'ubs-profiles-flask'))
+
+profile_ring = ProfileRing(PROFILE_DIR)
+
+def profiled(view):
+    """
+    Sample the view's stacks when the request asks for it (or is sampled).
+    With profiling disabled at startup the view is returned untouched.
+    """
+    if not core.profiling_enabled():
+        return view
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if not core.wants_profile(request.headers.get('X-Profile')):
+            return view(*args, **kwargs)
+        with StackSampler(threading.get_ident()) as sampler:
+            response = view(*args, **kwargs)
+        profile_ring.write(request.endpoint or view.__name__, sampler.counts)
+        return response
+
+    return wrapper
+
+def _check_token():
+    # Profiles expose code paths, so they are only served behind PROFILE_TOKEN
+    if not core.PROFILE_TOKEN:
+        abort(404)
+    if not core.token_matches(request.headers.get('X-Profile')):
+        abort(403)
+
+def list_profiles():
+    _check_token()
+    return jsonify({'profiles': profile_ring.names()})
+
+def download_profile(name):
+    _check_token()
+    if not PROFILE_NAME.match(name):
+        abort(404)
+    return send_from_directory(profile_ring.directory, name, mimetype='text/plain')
+
+def init_profiling(app):
+    """Register GET /api/profiles and GET /api/profiles/<name> on a Flask app"""
+    app.add_url_rule('/api/profiles', 'list_profiles', list_profiles)
+    app.add_url_rule('/api/profiles/<name>', 'download_profile', download_profile)
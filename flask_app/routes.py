@@ -1,18 +1,16 @@
 # flask_app/routes.py
-from flask import Blueprint, request, jsonify
-from math import hypot
+import json
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from flask_app.ticketing import parse_concerts, assign_concerts, BACKENDS, indexed_scorer
+from flask_app.solver import solve_cached
+from flask_app.profiling import profiled
 
 api_bp = Blueprint('api', __name__)
 
-VIP_POINTS = 100
-CARD_POINTS = 50
-
-def latency_points(d: float) -> int:
-    if d <= 2.0: return 30
-    if d <= 4.0: return 20
-    return 0
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/jsonl')
 
 @api_bp.route('/ticketing-agent', methods=['POST'])
+@profiled
 def ticketing_agent():
     if request.content_type != 'application/json':
         return jsonify({"error": "Content-Type must be application/json"}), 400
@@ -23,32 +21,87 @@ def ticketing_agent():
     customers = data.get("customers", [])
     concerts = data.get("concerts", [])
     priority = data.get("priority", {})
+    backend = current_app.config['TICKETING_BACKEND']
+    if current_app.debug or current_app.testing:
+        # Picking a backend per request is for comparing them; production only
+        # runs the configured one (linear and parallel are opt-in)
+        backend = request.args.get("backend", backend)
+    if backend not in BACKENDS:
+        return jsonify({"error": f"Unknown backend, expected one of {sorted(BACKENDS)}"}), 400
 
     # Pre-process concerts (preserve order)
-    clist = []
-    for c in concerts:
-        name = c["name"]
-        x, y = c["booking_center_location"]
-        clist.append((name, float(x), float(y)))
-
-    out = {}
-    for cust in customers:
-        cname = cust["name"]
-        vip = bool(cust["vip_status"])
-        cx, cy = map(float, cust["location"])
-        card = cust["credit_card"]
-
-        best_name, best_score = None, float("-inf")
-        for (n, x, y) in clist:
-            score = (VIP_POINTS if vip else 0)
-            if priority.get(card) == n:
-                score += CARD_POINTS
-            d = hypot(cx - x, cy - y)
-            score += latency_points(d)
-            if score > best_score:
-                best_score, best_name = score, n
-        out[cname] = best_name or ""
+    clist = parse_concerts(concerts)
+
+    # Default backend is the grid index: each customer only scores nearby concerts
+    out = assign_concerts(customers, clist, priority, backend)
 
     resp = jsonify(out)
     resp.headers["Content-Type"] = "application/json"
     return resp
+
+@api_bp.route('/ticketing-agent/stream', methods=['POST'])
+def ticketing_agent_stream():
+    """
+    Streaming variant of /ticketing-agent for very large customer lists.
+
+    Body is newline-delimited JSON: the first line holds {"concerts", "priority"},
+    every following line is one customer. Each customer is scored as soon as
+    its line arrives and answered with a {name: concert} line, so neither the
+    request nor the response is ever held in memory as a whole.
+    """
+    if request.mimetype not in NDJSON_MIMETYPES:
+        return jsonify({"error": "Content-Type must be application/x-ndjson"}), 400
+
+    stream = request.stream
+    try:
+        header = json.loads(stream.readline())
+    except ValueError:
+        header = None
+    if not isinstance(header, dict):
+        return jsonify({"error": "First line must be a JSON object with concerts and priority"}), 400
+    try:
+        clist = parse_concerts(header.get("concerts", []))
+    except (KeyError, TypeError, ValueError):
+        return jsonify({"error": "Invalid concerts"}), 400
+    priority = header.get("priority", {})
+    if not isinstance(priority, dict):
+        return jsonify({"error": "priority must be a JSON object"}), 400
+    score = indexed_scorer(clist, priority)
+
+    def generate():
+        for lineno, line in enumerate(stream, start=2):
+            if not line.strip():
+                continue
+            try:
+                cname, concert = score(json.loads(line))
+                if not isinstance(cname, str):
+                    raise TypeError("customer name must be a string")
+            except (KeyError, TypeError, ValueError):
+                yield json.dumps({"error": f"Invalid customer on line {lineno}"}) + "\n"
+                continue
+            yield json.dumps({cname: concert}) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@api_bp.route('/solution-1', methods=['POST'])
+@profiled
+def solution_1():
+    """
+    Run solutions.solution_1.solve on the posted {tasks, subway, starting_station}.
+    Identical inputs are answered from a result cache; new task sets on a known
+    subway network reuse its cached min-fee rows.
+    """
+    if request.content_type != 'application/json':
+        return jsonify({"error": "Content-Type must be application/json"}), 400
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Invalid JSON body"}), 400
+
+    try:
+        result, hit = solve_cached(data)
+    except (KeyError, TypeError, ValueError):
+        return jsonify({"error": "Invalid tasks, subway or starting_station"}), 400
+
+    resp = jsonify(result)
+    resp.headers["X-Cache"] = "HIT" if hit else "MISS"
+    return resp
@@ -0,0 +1,111 @@
+# flask_app/solver.py
+import hashlib
+import json
+import os
+import sys
+from collections import OrderedDict
+from threading import Lock
+
+from solutions.solution_1 import compute_fees, dijkstra_fees, solve
+
+# Byte budgets for the two caches behind /api/solution-1
+RESULT_CACHE_BYTES = int(os.getenv("SOLVER_RESULT_CACHE_BYTES", str(64 * 2**20)))
+FEE_CACHE_BYTES = int(os.getenv("SOLVER_FEE_CACHE_BYTES", str(256 * 2**20)))
+
+def canonical_hash(obj):
+    """Stable SHA-256 of a JSON-compatible object (key order does not matter)"""
+    blob = json.dumps(obj, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+class ByteLRU:
+    """Thread-safe LRU map whose capacity is a total byte size, not an entry count"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.entries = OrderedDict()  # key -> (value, nbytes)
+        self.lock = Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            self.entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value, nbytes):
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            if nbytes > self.max_bytes:
+                return  # would evict everything else and still not fit
+            self.entries[key] = (value, nbytes)
+            self.bytes += nbytes
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.bytes -= evicted
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+def row_bytes(row):
+    # List of pointers plus one int object per slot, a deliberate overestimate
+    return sys.getsizeof(row) + 32 * len(row)
+
+class FeeCache:
+    """
+    Drop-in for compute_fees that remembers min-fee rows per subway network.
+
+    Entries are keyed by the station set and edge list only, so requests that
+    share a network but bring different tasks reuse every row computed so far
+    and only run Dijkstra from sources not seen before.
+    """
+
+    def __init__(self, max_bytes=FEE_CACHE_BYTES):
+        self.lru = ByteLRU(max_bytes)
+
+    def __call__(self, station_ids, edges, sources, fee_mode="auto"):
+        key = canonical_hash([station_ids, sorted(edges)])
+        n = len(station_ids)
+        rows = self.lru.get(key)
+        if rows is None:
+            dist = compute_fees(station_ids, edges, sources, fee_mode)
+            rows = {i: row for i, row in enumerate(dist) if row is not None}
+        else:
+            missing = [s for s in sources if s not in rows]
+            if not missing:
+                return self._table(n, rows)
+            # Dense tables already hold every row, so only sparse entries get here
+            extra = dijkstra_fees(n, edges, missing)
+            rows = dict(rows)
+            rows.update((s, extra[s]) for s in missing)
+        self.lru.put(key, rows, sum(row_bytes(row) for row in rows.values()))
+        return self._table(n, rows)
+
+    @staticmethod
+    def _table(n, rows):
+        dist = [None] * n
+        for i, row in rows.items():
+            dist[i] = row
+        return dist
+
+fee_cache = FeeCache()
+result_cache = ByteLRU(RESULT_CACHE_BYTES)
+
+def solve_cached(input_obj):
+    """Return (result, cache_hit) for a solution_1 input, consulting both caches"""
+    key = canonical_hash({
+        "tasks": input_obj.get("tasks", []),
+        "subway": input_obj.get("subway", []),
+        "starting_station": input_obj.get("starting_station"),
+    })
+    result = result_cache.get(key)
+    if result is not None:
+        return result, True
+    result = solve(input_obj, fees=fee_cache)
+    result_cache.put(key, result, len(json.dumps(result)))
+    return result, False
@@ -0,0 +1,342 @@
+# flask_app/ticketing.py
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from math import floor, hypot, isfinite
+
+try:
+    import numpy as np
+except ImportError:  # NumPy backend is optional
+    np = None
+
+VIP_POINTS = 100
+CARD_POINTS = 50
+
+# Latency bands: (max distance, points). Only concerts inside the outer band
+# can score latency points, which is what the spatial index relies on.
+LATENCY_BANDS = ((2.0, 30), (4.0, 20))
+MAX_LATENCY_DISTANCE = LATENCY_BANDS[-1][0]
+
+# NumPy backend: below this many customer×concert pairs the array setup costs
+# more than it saves. Blocks are capped so the distance matrix stays bounded.
+NUMPY_MIN_PAIRS = 20_000
+NUMPY_BLOCK_PAIRS = 1 << 20
+
+# Process pool backend: worker count and the request size that justifies
+# starting the pool (both overridable through the environment).
+POOL_MIN_CUSTOMERS = int(os.getenv("TICKETING_POOL_MIN_CUSTOMERS", "50000"))
+POOL_SHARDS_PER_WORKER = 4
+
+def latency_points(d: float) -> int:
+    if d <= 2.0: return 30
+    if d <= 4.0: return 20
+    return 0
+
+def parse_concerts(concerts):
+    """Normalize the concerts payload into (name, x, y) tuples, preserving order"""
+    clist = []
+    for c in concerts:
+        name = c["name"]
+        x, y = c["booking_center_location"]
+        clist.append((name, float(x), float(y)))
+    return clist
+
+def parse_customer(cust):
+    """Normalize one customer record into (name, vip, x, y, card)"""
+    cx, cy = map(float, cust["location"])
+    return cust["name"], bool(cust["vip_status"]), cx, cy, cust["credit_card"]
+
+def assign_linear(customers, clist, priority):
+    """Reference scorer: every customer against every concert, O(customers × concerts)"""
+    out = {}
+    for cust in customers:
+        cname, vip, cx, cy, card = parse_customer(cust)
+
+        best_name, best_score = None, float("-inf")
+        for (n, x, y) in clist:
+            score = (VIP_POINTS if vip else 0)
+            if priority.get(card) == n:
+                score += CARD_POINTS
+            d = hypot(cx - x, cy - y)
+            score += latency_points(d)
+            if score > best_score:
+                best_score, best_name = score, n
+        out[cname] = best_name or ""
+    return out
+
+class ScoringPlan:
+    """
+    Per-request scoring tables compiled from the concerts and priority map.
+
+    Each credit card is resolved once to the indices of the concert(s) it
+    gives CARD_POINTS to, so scoring a customer never touches `priority` or
+    compares concert names. The VIP bonus is the same for every concert a
+    customer could get, so it never enters the comparison. When the card bonus alone beats the best latency
+    band, a customer with a matching card can only end up at one of those
+    concerts and the rest of the list is never scored.
+    """
+
+    def __init__(self, clist, priority):
+        self.clist = clist
+        by_name = {}
+        for i, (n, _, _) in enumerate(clist):
+            by_name.setdefault(n, []).append(i)
+        self.card_targets = {}
+        for card, name in priority.items():
+            hits = by_name.get(name)
+            if hits:
+                self.card_targets[card] = tuple(hits)
+        self.card_always_wins = CARD_POINTS > LATENCY_BANDS[0][1]
+
+    def card_hits(self, card):
+        return self.card_targets.get(card, ())
+
+    def best_of(self, hits, cx, cy):
+        """Winner among the card concerts alone (lowest index on ties)"""
+        clist = self.clist
+        best_i, best_score = -1, -1
+        for i in hits:
+            _, x, y = clist[i]
+            score = latency_points(hypot(cx - x, cy - y))
+            if score > best_score:
+                best_i, best_score = i, score
+        return best_i
+
+    def best(self, cx, cy, card):
+        """Index of the winning concert scanning every concert, or -1 if there are none"""
+        hits = self.card_hits(card)
+        if hits and self.card_always_wins:
+            return self.best_of(hits, cx, cy)
+
+        (inner, inner_pts), (outer, outer_pts) = LATENCY_BANDS
+        best_i, best_score = -1, -1
+        for i, (_, x, y) in enumerate(self.clist):
+            d = hypot(cx - x, cy - y)
+            score = inner_pts if d <= inner else outer_pts if d <= outer else 0
+            if score > best_score:
+                best_i, best_score = i, score
+        for i in hits:
+            _, x, y = self.clist[i]
+            score = CARD_POINTS + latency_points(hypot(cx - x, cy - y))
+            if score > best_score or (score == best_score and i < best_i):
+                best_i, best_score = i, score
+        return best_i
+
+def assign_planned(customers, clist, priority):
+    """Linear scan driven by a ScoringPlan: no dict lookups inside the concert loop"""
+    plan = ScoringPlan(clist, priority)
+    out = {}
+    for cust in customers:
+        cname, vip, cx, cy, card = parse_customer(cust)
+        i = plan.best(cx, cy, card)
+        out[cname] = (clist[i][0] if i >= 0 else None) or ""
+    return out
+
+class ConcertIndex:
+    """
+    Uniform grid over concert booking centers.
+
+    Cells are MAX_LATENCY_DISTANCE wide, so every concert within latency range
+    of a point lies in the 3x3 block of cells around it. The cell size is a
+    power of two, so the division below is exact and no concert near a cell
+    edge can be missed.
+    """
+
+    CELL = MAX_LATENCY_DISTANCE
+
+    def __init__(self, clist):
+        self.clist = clist
+        self.cells = {}
+        for i, (n, x, y) in enumerate(clist):
+            # Non-finite coordinates can never be within range of anything
+            if isfinite(x) and isfinite(y):
+                key = (floor(x / self.CELL), floor(y / self.CELL))
+                self.cells.setdefault(key, []).append(i)
+
+    def nearby(self, cx, cy):
+        """Indices of concerts that may be within latency range of (cx, cy)"""
+        if not (isfinite(cx) and isfinite(cy)):
+            return []
+        gx, gy = floor(cx / self.CELL), floor(cy / self.CELL)
+        found = []
+        cells = self.cells
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                bucket = cells.get((gx + dx, gy + dy))
+                if bucket:
+                    found.extend(bucket)
+        return found
+
+    def best(self, cx, cy, card_hits=()):
+        """
+        Index of the winning concert for a customer at (cx, cy), or -1 if there
+        are no concerts. `card_hits` are the indices earning CARD_POINTS.
+
+        Concerts outside every latency band and not matching the card score the
+        same (zero) points, so the first concert wins unless some candidate
+        scores strictly more. Ties among candidates go to the lowest index,
+        matching the order-dependent `score > best_score` of the linear scan.
+        """
+        if not self.clist:
+            return -1
+        clist = self.clist
+
+        best_i, best_score = 0, 0
+        for i in self.nearby(cx, cy):
+            n, x, y = clist[i]
+            score = latency_points(hypot(cx - x, cy - y))
+            if score > best_score or (score == best_score and i < best_i):
+                best_i, best_score = i, score
+        for i in card_hits:
+            n, x, y = clist[i]
+            score = CARD_POINTS + latency_points(hypot(cx - x, cy - y))
+            if score > best_score or (score == best_score and i < best_i):
+                best_i, best_score = i, score
+        return best_i
+
+def indexed_scorer(clist, priority):
+    """
+    Build the plan and grid index once and return a function mapping one
+    customer record to (customer name, concert name)
+    """
+    plan = ScoringPlan(clist, priority)
+    index = ConcertIndex(clist)
+
+    def score(cust):
+        cname, vip, cx, cy, card = parse_customer(cust)
+        hits = plan.card_hits(card)
+        if hits and plan.card_always_wins:
+            i = plan.best_of(hits, cx, cy)
+        else:
+            i = index.best(cx, cy, hits)
+        return cname, (clist[i][0] if i >= 0 else None) or ""
+
+    return score
+
+def assign_indexed(customers, clist, priority):
+    """Same result as assign_linear, looking up only concerts near each customer"""
+    return dict(map(indexed_scorer(clist, priority), customers))
+
+def assign_numpy(customers, clist, priority, block_pairs=NUMPY_BLOCK_PAIRS):
+    """
+    Vectorized scorer: distance matrix computed a block of customers at a time.
+
+    The VIP bonus is the same for every concert of a customer so it cannot
+    change the winner and is left out. np.argmax returns the first maximum,
+    which is the `score > best_score` tie rule. Falls back to the linear scan
+    for tiny inputs or when NumPy is not installed.
+    """
+    if np is None or not clist or len(customers) * len(clist) < NUMPY_MIN_PAIRS:
+        return assign_linear(customers, clist, priority)
+
+    plan = ScoringPlan(clist, priority)
+    names = [n for (n, _, _) in clist]
+    xs = np.array([x for (_, x, _) in clist], dtype=np.float64)
+    ys = np.array([y for (_, _, y) in clist], dtype=np.float64)
+
+    parsed = [parse_customer(cust) for cust in customers]
+    cxs = np.array([p[2] for p in parsed], dtype=np.float64)
+    cys = np.array([p[3] for p in parsed], dtype=np.float64)
+
+    (inner, inner_pts), (outer, outer_pts) = LATENCY_BANDS
+    rows = max(1, block_pairs // len(clist))
+    out = {}
+    for start in range(0, len(parsed), rows):
+        stop = min(start + rows, len(parsed))
+        d = np.hypot(cxs[start:stop, None] - xs[None, :], cys[start:stop, None] - ys[None, :])
+        score = np.where(d <= inner, inner_pts, np.where(d <= outer, outer_pts, 0)).astype(np.int16)
+
+        # np.hypot and math.hypot may disagree in the last ulp; re-score the
+        # handful of pairs sitting on a band edge exactly as the linear scan does
+        edge = np.nonzero((np.abs(d - inner) <= 1e-9) | (np.abs(d - outer) <= 1e-9))
+        for r, c in zip(*edge):
+            p = parsed[start + r]
+            score[r, c] = latency_points(hypot(p[2] - clist[c][1], p[3] - clist[c][2]))
+
+        for r in range(stop - start):
+            for c in plan.card_hits(parsed[start + r][4]):
+                score[r, c] += CARD_POINTS
+
+        best = np.argmax(score, axis=1)
+        for r, i in enumerate(best.tolist()):
+            out[parsed[start + r][0]] = names[i] or ""
+    return out
+
+# One long-lived pool per server process and worker count, created on first
+# use. Children come from a forkserver (or spawn), never a fork of a threaded
+# server worker, and the pool is replaced if the owning process has changed.
+_pools = {}
+_pools_pid = None
+_pools_lock = threading.Lock()
+
+def _get_pool(workers):
+    global _pools, _pools_pid
+    with _pools_lock:
+        if _pools_pid != os.getpid():
+            _pools, _pools_pid = {}, os.getpid()
+        pool = _pools.get(workers)
+        if pool is None:
+            if "forkserver" in multiprocessing.get_all_start_methods():
+                ctx = multiprocessing.get_context("forkserver")
+                ctx.set_forkserver_preload([__name__])
+            else:
+                ctx = multiprocessing.get_context("spawn")
+            pool = _pools[workers] = ProcessPoolExecutor(workers, mp_context=ctx)
+        return pool
+
+def _discard_pool(workers, pool):
+    with _pools_lock:
+        if _pools.get(workers) is pool:
+            del _pools[workers]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def _pool_score(customers, clist, priority):
+    score = indexed_scorer(clist, priority)
+    return [score(cust) for cust in customers]
+
+def assign_parallel(customers, clist, priority, workers=None):
+    """
+    Shard customers across a process pool and merge the results in input order.
+
+    The pool outlives the request, so each shard carries its slice of
+    customers plus the concert table and priorities, and concert names come
+    back. Requests below POOL_MIN_CUSTOMERS run in-process on the grid index.
+    """
+    workers = workers or int(os.getenv("TICKETING_WORKERS") or os.cpu_count() or 1)
+    if workers <= 1 or len(customers) < POOL_MIN_CUSTOMERS:
+        return assign_indexed(customers, clist, priority)
+
+    shard = -(-len(customers) // (workers * POOL_SHARDS_PER_WORKER))
+    pool = _get_pool(workers)
+    futures = [pool.submit(_pool_score, customers[i:i + shard], clist, priority)
+               for i in range(0, len(customers), shard)]
+    out = {}
+    try:
+        for future in futures:
+            out.update(future.result())
+    except BrokenProcessPool:
+        # A child died (e.g. OOM-killed); the next request gets a fresh pool
+        _discard_pool(workers, pool)
+        raise
+    return out
+
+BACKENDS = {
+    "linear": assign_linear,
+    "plan": assign_planned,
+    "index": assign_indexed,
+    "numpy": assign_numpy,
+    "parallel": assign_parallel,
+}
+
+def configured_backend():
+    """The TICKETING_BACKEND setting (default: index); checked once when the app is created"""
+    name = os.getenv("TICKETING_BACKEND", "index")
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown TICKETING_BACKEND {name!r}, expected one of {sorted(BACKENDS)}")
+    return name
+
+def assign_concerts(customers, clist, priority, backend="index"):
+    """Dispatch to the scorer named by `backend`"""
+    return BACKENDS[backend](customers, clist, priority)
@@ -0,0 +1,11 @@
+"""
+Gunicorn hooks shared by both servers (passed by start_servers.py via --config).
+"""
+
+import os
+
+def child_exit(server, worker):
+    # Drop a dead worker's live gauges (in-flight requests) from the merged /metrics
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
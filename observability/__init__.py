@@ -0,0 +1 @@
+"""Metrics and profiling shared by the Flask and FastAPI apps; each app keeps only its framework glue"""
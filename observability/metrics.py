@@ -0,0 +1,40 @@
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Gauge, Histogram, generate_latest, multiprocess,
+)
+
+# Log-spaced latency buckets (0.25 ms .. ~33 s, doubling), HDR-histogram style:
+# constant relative error across the whole range with only 18 counters per series.
+LATENCY_BUCKETS = tuple(0.00025 * 2 ** i for i in range(18))
+SIZE_BUCKETS = tuple(64 * 4 ** i for i in range(11))  # 64 B .. 64 MiB
+
+class HTTPMetrics:
+    """
+    The request metrics of one app. Each instance has its own registry, so
+    both apps can be imported into one process (tests) without clashing.
+    """
+
+    def __init__(self):
+        self.registry = CollectorRegistry()
+        self.request_latency = Histogram("http_request_duration_seconds", "Request latency by route",
+                                         ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+                                         registry=self.registry)
+        self.request_size = Histogram("http_request_size_bytes", "Request body size by route",
+                                      ["method", "route"], buckets=SIZE_BUCKETS, registry=self.registry)
+        self.response_size = Histogram("http_response_size_bytes", "Response body size by route",
+                                       ["method", "route"], buckets=SIZE_BUCKETS, registry=self.registry)
+        self.in_progress = Gauge("http_requests_in_progress", "Requests currently being handled",
+                                 ["method"], multiprocess_mode="livesum", registry=self.registry)
+
+    def exposition(self) -> bytes:
+        """
+        Prometheus text format. Under Gunicorn, PROMETHEUS_MULTIPROC_DIR makes
+        every worker write its samples to that directory and this merges them all.
+        """
+        if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = self.registry
+        return generate_latest(registry)
@@ -0,0 +1,103 @@
+import hmac
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+# Profiling is off unless one of these is set when the app starts:
+# PROFILE_TOKEN enables per-request profiling with an `X-Profile: <token>` header
+# and is required for the download endpoints; PROFILE_SAMPLE_RATE profiles that
+# fraction of all eligible requests.
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.005"))   # seconds between stack samples
+PROFILE_RING_SIZE = int(os.getenv("PROFILE_RING_SIZE", "50"))       # profile files kept on disk
+
+PROFILE_NAME = re.compile(r"^[\w.-]+\.folded$")
+
+def profiling_enabled():
+    return bool(PROFILE_TOKEN) or PROFILE_SAMPLE_RATE > 0
+
+def token_matches(token: Optional[str]) -> bool:
+    """Whether `token` is the configured PROFILE_TOKEN; never true when none is configured"""
+    return bool(PROFILE_TOKEN) and token is not None and hmac.compare_digest(token, PROFILE_TOKEN)
+
+def wants_profile(token: Optional[str]) -> bool:
+    """Profile this request: it carries the token, or it falls in the sample rate"""
+    return token_matches(token) or (PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE)
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+class StackSampler:
+    """
+    Wall-clock sampler for one thread: a daemon thread reads the target's
+    current frame every `interval` seconds and counts collapsed stacks
+    ("outer;inner;leaf"), the input format of flamegraph tools.
+
+    For an async request the target is the event loop thread, so the samples
+    cover whatever the loop ran while the request was in flight.
+    """
+
+    def __init__(self, thread_id, interval=PROFILE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.counts[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+class ProfileRing:
+    """The newest `size` collapsed-stack files in `directory`; older ones are deleted on write"""
+
+    def __init__(self, directory, size=PROFILE_RING_SIZE):
+        self.directory = directory
+        self.size = size
+
+    def write(self, label, counts):
+        os.makedirs(self.directory, exist_ok=True)
+        label = re.sub(r"[^\w.-]", "_", label)
+        name = f"{time.time_ns()}-{os.getpid()}-{label}.folded"
+        with open(os.path.join(self.directory, name), "w") as f:
+            f.writelines(f"{stack} {count}\n" for stack, count in counts.most_common())
+        for old in self.names()[self.size:]:
+            try:
+                os.remove(os.path.join(self.directory, old))
+            except FileNotFoundError:  # another worker pruned it first
+                pass
+        return name
+
+    def names(self):
+        """Profile file names, newest first"""
+        if not os.path.isdir(self.directory):
+            return []
+        names = [name for name in os.listdir(self.directory) if PROFILE_NAME.match(name)]
+        return sorted(names, key=lambda name: int(name.split("-", 1)[0]), reverse=True)
@@ -1,6 +1,92 @@
-from math import inf
+import heapq
+from array import array
+from bisect import bisect_left, bisect_right
+from math import inf, log2
 
-def solve(input_obj):
+def int_column(values):
+    """Pack a list into a compact array('q'), or keep the list if a value is not a 64-bit int"""
+    try:
+        return array('q', values)
+    except (TypeError, OverflowError):
+        return values
+
+def floyd_warshall_fees(n, edges):
+    """
+    Dense all-pairs min fees, O(n^3) time and O(n^2) memory.
+    Returns a list of n rows; row i holds the min fee from station i to every station.
+    """
+    dist = [[inf]*n for _ in range(n)]
+    for i in range(n):
+        dist[i][i] = 0
+    for ia, ib, w in edges:
+        if w < dist[ia][ib]:
+            dist[ia][ib] = w
+            dist[ib][ia] = w
+    for k in range(n):
+        dk = dist[k]
+        for i in range(n):
+            dik = dist[i][k]
+            if dik == inf:
+                continue
+            di = dist[i]
+            for j in range(n):
+                cand = dik + dk[j]
+                if cand < di[j]:
+                    di[j] = cand
+    return dist
+
+def dijkstra_fees(n, edges, sources):
+    """
+    Sparse min fees from each station in `sources` only (heap-based Dijkstra).
+    Returns a list of n rows where only the rows of `sources` are filled in
+    (the others are None), so memory is O(len(sources) * n).
+    """
+    adj = [[] for _ in range(n)]
+    for ia, ib, w in edges:
+        adj[ia].append((ib, w))
+        adj[ib].append((ia, w))
+
+    dist = [None]*n
+    for src in sources:
+        if dist[src] is not None:
+            continue
+        row = [inf]*n
+        row[src] = 0
+        heap = [(0, src)]
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > row[u]:
+                continue
+            for v, w in adj[u]:
+                cand = d + w
+                if cand < row[v]:
+                    row[v] = cand
+                    heapq.heappush(heap, (cand, v))
+        dist[src] = row
+    return dist
+
+def choose_fee_mode(n, n_edges, n_sources, has_negative_fee):
+    """Pick "dense" (Floyd–Warshall) or "sparse" (Dijkstra per source) by estimated cost"""
+    if has_negative_fee or n == 0:
+        return "dense"  # Dijkstra needs non-negative fees
+    sparse_cost = n_sources * (n + 2 * n_edges) * max(1.0, log2(n))
+    return "sparse" if sparse_cost < n ** 3 else "dense"
+
+def compute_fees(station_ids, edges, sources, fee_mode="auto"):
+    """
+    Min fee rows for every station in `sources` (dense mode fills all rows).
+    `edges` are (station index, station index, fee) over `station_ids`.
+    """
+    n = len(station_ids)
+    if fee_mode == "auto":
+        fee_mode = choose_fee_mode(n, len(edges), len(sources), any(w < 0 for _, _, w in edges))
+    if fee_mode == "sparse":
+        return dijkstra_fees(n, edges, sources)
+    if fee_mode == "dense":
+        return floyd_warshall_fees(n, edges)
+    raise ValueError(f"Unknown fee_mode: {fee_mode}")
+
+def solve(input_obj, fee_mode="auto", fees=compute_fees):
     """
     Input shape:
     {
@@ -19,6 +105,11 @@ def solve(input_obj):
         "min_fee": int,
         "schedule": [str]  # task names in ascending start time
     }
+
+    fee_mode selects how station-to-station min fees are computed: "dense"
+    (Floyd–Warshall over every station), "sparse" (Dijkstra from the starting
+    station and each task station only) or "auto" to pick by graph density.
+    `fees` lets callers swap in a caching variant of compute_fees.
     """
     tasks = input_obj.get("tasks", [])
     subway = input_obj.get("subway", [])
@@ -38,80 +129,95 @@ def solve(input_obj):
     station_ids = sorted(stations)
     id_to_idx = {sid: i for i, sid in enumerate(station_ids)}
     s0 = id_to_idx[s0_id]
-    n = len(station_ids)
 
-    # Floyd–Warshall to find all-pairs min fees
-    dist = [[inf]*n for _ in range(n)]
-    for i in range(n):
-        dist[i][i] = 0
+    # ---- Min fees between the stations the DP actually visits ----
+    edges = []
     for r in subway:
         a, b = r["connection"]
-        w = r["fee"]
-        ia, ib = id_to_idx[a], id_to_idx[b]
-        if w < dist[ia][ib]:
-            dist[ia][ib] = w
-            dist[ib][ia] = w
-    # Floyd–Warshall
-    for k in range(n):
-        dk = dist[k]
-        for i in range(n):
-            dik = dist[i][k]
-            if dik == inf:
-                continue
-            di = dist[i]
-            for j in range(n):
-                cand = dik + dk[j]
-                if cand < di[j]:
-                    di[j] = cand
+        edges.append((id_to_idx[a], id_to_idx[b], r["fee"]))
+    sources = sorted({s0} | {id_to_idx[t["station"]] for t in tasks})
+    dist = fees(station_ids, edges, sources, fee_mode)
 
     # ---- Normalize + sort tasks by end time (classic interval DP) ----
-    T = [
-        {
-            "name": t["name"],
-            "start": t["start"],
-            "end": t["end"],
-            "station": id_to_idx[t["station"]],
-            "score": t["score"],
-        }
-        for t in tasks
-    ]
+    # Tasks live in parallel int64 columns in end-sorted order; `order` maps a
+    # sorted position back to the input task so names are never copied.
     # Sort by end, tie by start (helps determinism)
-    T.sort(key=lambda x: (x["end"], x["start"]))
-    m = len(T)
+    order = sorted(range(len(tasks)), key=lambda k: (tasks[k]["end"], tasks[k]["start"]))
+    order = int_column(order)
+    start = int_column([tasks[k]["start"] for k in order])
+    end = int_column([tasks[k]["end"] for k in order])
+    station = int_column([id_to_idx[tasks[k]["station"]] for k in order])
+    score = int_column([tasks[k]["score"] for k in order])
+    m = len(order)
 
     # ---- DP: bestScore[i], minFeeToEnd[i] (fee up to task i, no final return), prev[i] ----
+    # bestScore stays a list: summed scores may outgrow 64 bits (or be floats)
     bestScore = [0]*m
-    minFeeToEnd = [inf]*m
-    prev = [-1]*m
+    minFeeToEnd = [inf]*m  # stays a list: unreachable stations cost inf
+    prev = int_column([-1]*m)
+
+    # Compatible predecessors of i are the tasks j < i with end[j] <= start[i],
+    # i.e. a prefix of the end-sorted order found by binary search. The transition
+    # fee only depends on the predecessor's station, so per station we keep the
+    # prefix-best (score desc, fee asc, index asc) and only compare one candidate
+    # per station instead of every earlier task. When the hop is unreachable
+    # every candidate fee is inf, so the original scan keeps the earliest task
+    # with the best score; `pFirst` tracks that one per prefix.
+    station_first = []   # index of the first task seen at each station, increasing
+    station_order = []   # stations in order of first appearance
+    station_slot = {}    # station -> position in station_order / station_tables
+    station_tables = []  # (task indices, prefix best score, fee, index, first index) per station
 
     for i in range(m):
-        si = T[i]["station"]
-        score_i = T[i]["score"]
+        si = station[i]
+        score_i = score[i]
 
         # Base: only this task (s0 -> si)
         bScore = score_i
         bFee = dist[s0][si]
         p = -1
 
-        # Transition: from any non-overlapping task j (T[j].end <= T[i].start)
-        for j in range(i):
-            if T[j]["end"] <= T[i]["start"]:
-                candScore = bestScore[j] + score_i
-                candFee = minFeeToEnd[j] + dist[T[j]["station"]][si]
-                if (candScore > bScore) or (candScore == bScore and candFee < bFee):
-                    bScore = candScore
-                    bFee = candFee
-                    p = j
+        # Transition: best non-overlapping predecessor among the stations seen so far
+        limit = min(bisect_right(end, start[i]), i)
+        cScore, cFee, cj = -inf, inf, -1
+        for k in range(bisect_left(station_first, limit)):
+            sj = station_order[k]
+            js, pScore, pFee, pIdx, pFirst = station_tables[k]
+            pos = bisect_left(js, limit) - 1
+            hop = dist[sj][si]
+            candScore = pScore[pos] + score_i
+            candFee = pFee[pos] + hop
+            j = pIdx[pos] if hop != inf else pFirst[pos]
+            if (candScore > cScore) or (candScore == cScore and
+                                        (candFee < cFee or (candFee == cFee and j < cj))):
+                cScore, cFee, cj = candScore, candFee, j
+        if (cScore > bScore) or (cScore == bScore and cFee < bFee):
+            bScore, bFee, p = cScore, cFee, cj
 
         bestScore[i] = bScore
         minFeeToEnd[i] = bFee
         prev[i] = p
 
+        # Extend the prefix-best arrays of station si with task i
+        slot = station_slot.get(si)
+        if slot is None:
+            slot = station_slot[si] = len(station_order)
+            station_tables.append(([], [], [], array('q'), array('q')))
+            station_first.append(i)
+            station_order.append(si)
+        js, pScore, pFee, pIdx, pFirst = station_tables[slot]
+        if js and (pScore[-1] > bScore or (pScore[-1] == bScore and pFee[-1] <= bFee)):
+            pScore.append(pScore[-1]); pFee.append(pFee[-1]); pIdx.append(pIdx[-1])
+        else:
+            pScore.append(bScore); pFee.append(bFee); pIdx.append(i)
+        pFirst.append(pFirst[-1] if js and pScore[-2] >= bScore else i)
+        js.append(i)
+
     # ---- Choose best ending task, adding return fee back to s0 ----
     ansScore, ansFee, last = 0, 0, -1  # empty schedule candidate
     for i in range(m):
         totalScore = bestScore[i]
-        totalFee = minFeeToEnd[i] + dist[T[i]["station"]][s0]
+        totalFee = minFeeToEnd[i] + dist[station[i]][s0]
         if (totalScore > ansScore) or (totalScore == ansScore and totalFee < ansFee):
             ansScore, ansFee, last = totalScore, totalFee, i
 
@@ -123,17 +229,17 @@ def solve(input_obj):
     chosen = []
     cur = last
     while cur != -1:
-        chosen.append(T[cur])
+        chosen.append(cur)
         cur = prev[cur]
     chosen.reverse()  # now in increasing end-time order
 
     # Spec requires schedule sorted by start time
-    chosen.sort(key=lambda x: (x["start"], x["end"], x["name"]))
+    chosen.sort(key=lambda i: (start[i], end[i], tasks[order[i]]["name"]))
 
     return {
         "max_score": ansScore,
         "min_fee": ansFee,
-        "schedule": [t["name"] for t in chosen],
+        "schedule": [tasks[order[i]]["name"] for i in chosen],
     }
 
 
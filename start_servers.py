@@ -1,18 +1,45 @@
 #!/usr/bin/env python3
 """
 Startup script for the UBS Coding Challenge servers
+
+Runs each server under Gunicorn: FastAPI on UvicornWorker, Flask on gthread
+(or gevent) workers. The script reports ready once every server answers
+/health, then runs until interrupted and stops them gracefully on
+Ctrl+C / SIGTERM.
+
+Usage:
+    python start_servers.py [flask|fastapi|both] [--workers N] [--reload]
 """
 
+import argparse
 import os
-import sys
+import shutil
+import signal
 import subprocess
+import sys
+import tempfile
 import time
+import urllib.request
 from pathlib import Path
 
+ROOT = Path(__file__).resolve().parent
+CPUS = os.cpu_count() or 1
+
+# Tuning knobs (overridable through the environment)
+FLASK_PORT = int(os.getenv("FLASK_PORT", "5000"))
+FASTAPI_PORT = int(os.getenv("FASTAPI_PORT", "8000"))
+FLASK_WORKER_CLASS = os.getenv("FLASK_WORKER_CLASS", "gthread")   # gthread or gevent
+FLASK_THREADS = int(os.getenv("FLASK_THREADS", "4"))
+SERVER_KEEPALIVE = int(os.getenv("SERVER_KEEPALIVE", "5"))         # seconds an idle connection stays open
+SERVER_BACKLOG = int(os.getenv("SERVER_BACKLOG", "2048"))
+SERVER_TIMEOUT = int(os.getenv("SERVER_TIMEOUT", "60"))            # seconds before a stuck worker is restarted
+GRACEFUL_TIMEOUT = int(os.getenv("GRACEFUL_TIMEOUT", "30"))        # seconds in-flight requests get to finish
+READY_TIMEOUT = float(os.getenv("READY_TIMEOUT", "30"))
+
 def check_dependencies():
     """Check if required packages are installed"""
     try:
-        import flask, fastapi, uvicorn, pytest
+        import flask, fastapi, uvicorn, gunicorn
         print("✓ All dependencies are installed")
         return True
     except ImportError as e:
@@ -20,73 +47,143 @@ def check_dependencies():
         print("Please run: pip install -r requirements.txt")
         return False
 
-def start_flask_server():
-    """Start the Flask server"""
-    print("Starting Flask server...")
-    flask_dir = Path(__file__).parent / "flask_app"
-    os.chdir(flask_dir)
-    
-    env = os.environ.copy()
-    env['PYTHONPATH'] = str(flask_dir)
-    
-    return subprocess.Popen([
-        sys.executable, "app.py"
-    ], env=env)
-
-def start_fastapi_server():
-    """Start the FastAPI server"""
-    print("Starting FastAPI server...")
-    fastapi_dir = Path(__file__).parent / "fastapi_app"
-    os.chdir(fastapi_dir)
-    
+def default_workers(name):
+    """
+    Worker processes per server.
+
+    Flask workers block on CPU-bound handlers, so the classic 2 * CPUs + 1;
+    FastAPI workers are async and already overlap I/O, so one per CPU.
+    """
+    if name == "flask":
+        return int(os.getenv("FLASK_WORKERS", str(2 * CPUS + 1)))
+    return int(os.getenv("FASTAPI_WORKERS", str(CPUS)))
+
+def gunicorn_command(name, workers, reload=False):
+    """Gunicorn argv for one server"""
+    port = FLASK_PORT if name == "flask" else FASTAPI_PORT
+    command = [
+        sys.executable, "-m", "gunicorn",
+        "--chdir", str(ROOT),
+        "--config", str(ROOT / "gunicorn_conf.py"),
+        "--bind", f"0.0.0.0:{port}",
+        "--workers", str(workers),
+        "--keep-alive", str(SERVER_KEEPALIVE),
+        "--backlog", str(SERVER_BACKLOG),
+        "--timeout", str(SERVER_TIMEOUT),
+        "--graceful-timeout", str(GRACEFUL_TIMEOUT),
+        "--access-logfile", "-",
+    ]
+    # Preloading imports the app once in the master and shares it copy-on-write;
+    # it is incompatible with code reloading.
+    command.append("--reload" if reload else "--preload")
+    if name == "flask":
+        command += ["--worker-class", FLASK_WORKER_CLASS]
+        if FLASK_WORKER_CLASS == "gthread":
+            command += ["--threads", str(FLASK_THREADS)]
+        command.append("flask_app.app:app")
+    else:
+        # The FastAPI modules import each other relative to fastapi_app/
+        command += ["--worker-class", "uvicorn.workers.UvicornWorker",
+                    "--pythonpath", str(ROOT / "fastapi_app"),
+                    "fastapi_app.main:app"]
+    return command
+
+def metrics_dir(name):
+    """Fresh per-server directory where every worker writes its /metrics samples"""
+    path = Path(os.getenv("METRICS_DIR", tempfile.gettempdir())) / f"ubs-metrics-{name}"
+    shutil.rmtree(path, ignore_errors=True)  # stale samples from an earlier run
+    path.mkdir(parents=True)
+    return path
+
+def server_env(name, workers):
     env = os.environ.copy()
-    env['PYTHONPATH'] = str(fastapi_dir)
-    
-    return subprocess.Popen([
-        sys.executable, "-m", "uvicorn", "main:app", "--reload", "--port", "8000"
-    ], env=env)
+    env["PROMETHEUS_MULTIPROC_DIR"] = str(metrics_dir(name))
+    if name == "fastapi":
+        # Every FastAPI worker owns a grading pool; split the CPUs between them
+        env.setdefault("GRADER_WORKERS", str(max(1, CPUS // workers)))
+    return env
+
+def wait_until_ready(name, process, port, timeout=READY_TIMEOUT):
+    """Poll /health until it answers 200; False if the server exits or the timeout passes"""
+    url = f"http://127.0.0.1:{port}/health"
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            print(f"✗ {name} server exited with code {process.returncode}")
+            return False
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return True
+        except OSError:
+            pass
+        time.sleep(0.1)
+    print(f"✗ {name} server did not answer {url} within {timeout:.0f}s")
+    return False
+
+def stop_servers(processes):
+    """SIGTERM lets Gunicorn finish in-flight requests (up to GRACEFUL_TIMEOUT) before exiting"""
+    for name, process in processes:
+        if process.poll() is None:
+            print(f"Stopping {name} server...")
+            process.send_signal(signal.SIGTERM)
+    for name, process in processes:
+        try:
+            process.wait(GRACEFUL_TIMEOUT + 5)
+        except subprocess.TimeoutExpired:
+            print(f"{name} server did not drain in time, killing it")
+            process.kill()
+            process.wait()
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Start the Flask and/or FastAPI servers under Gunicorn")
+    parser.add_argument("server", nargs="?", default="both", choices=["flask", "fastapi", "both"])
+    parser.add_argument("--workers", type=int, help="worker processes per server (default: sized from CPU count)")
+    parser.add_argument("--reload", action="store_true", help="restart workers on code changes (development)")
+    args = parser.parse_args(argv)
 
-def main():
+    if os.name == "nt":
+        print("Gunicorn does not run on Windows; use start_servers.bat instead")
+        sys.exit(1)
     if not check_dependencies():
         sys.exit(1)
-    
+
     print("UBS Coding Challenge 2025 - Server Startup")
     print("=" * 50)
-    
-    choice = input("Which server would you like to start? (flask/fastapi/both): ").lower()
-    
+
+    names = ["flask", "fastapi"] if args.server == "both" else [args.server]
     processes = []
-    
-    if choice in ["flask", "both"]:
-        flask_process = start_flask_server()
-        processes.append(("Flask", flask_process))
-        time.sleep(2)  # Give Flask time to start
-        print("Flask server should be running at: http://localhost:5000")
-    
-    if choice in ["fastapi", "both"]:
-        fastapi_process = start_fastapi_server()
-        processes.append(("FastAPI", fastapi_process))
-        time.sleep(2)  # Give FastAPI time to start
-        print("FastAPI server should be running at: http://localhost:8000")
-        print("FastAPI docs available at: http://localhost:8000/docs")
-    
-    if not processes:
-        print("Invalid choice. Please select 'flask', 'fastapi', or 'both'")
-        return
-    
-    print("\nServers are starting up...")
-    print("Press Ctrl+C to stop all servers")
-    
+    for name in names:
+        workers = args.workers or default_workers(name)
+        print(f"Starting {name} server with {workers} workers...")
+        # Own session: a terminal Ctrl+C would make Gunicorn quit without draining,
+        # so only this script sees it and forwards a graceful SIGTERM.
+        process = subprocess.Popen(gunicorn_command(name, workers, args.reload),
+                                   env=server_env(name, workers), cwd=ROOT, start_new_session=True)
+        processes.append((name, process))
+
+    # Turn SIGTERM (e.g. `docker stop`) into the same graceful path as Ctrl+C
+    signal.signal(signal.SIGTERM, _interrupt)
     try:
-        # Wait for all processes
+        for name, process in processes:
+            port = FLASK_PORT if name == "flask" else FASTAPI_PORT
+            if not wait_until_ready(name, process, port):
+                stop_servers(processes)
+                sys.exit(1)
+            print(f"✓ {name} server is ready at: http://localhost:{port}")
+            if name == "fastapi":
+                print(f"FastAPI docs available at: http://localhost:{port}/docs")
+
+        print("Press Ctrl+C to stop all servers")
         for name, process in processes:
             process.wait()
     except KeyboardInterrupt:
         print("\nShutting down servers...")
-        for name, process in processes:
-            print(f"Stopping {name} server...")
-            process.terminate()
-            process.wait()
+    finally:
+        stop_servers(processes)
         print("All servers stopped.")
 
 if __name__ == "__main__":
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The FastAPI app imports its modules relative to fastapi_app/ (see README: `cd fastapi_app`)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fastapi_app"))
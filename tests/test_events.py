@@ -0,0 +1,77 @@
+import asyncio
+import json
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from events import DROPPED, EventHub, event_hub, event_stream
+from main import app
+from routers import submissions
+
+class TestEventHub:
+    """Tests for the in-process pub/sub hub behind the SSE endpoints"""
+
+    def test_publish_reaches_topic_subscribers(self):
+        async def run():
+            hub = EventHub()
+            with hub.subscription("a") as a, hub.subscription("b") as b:
+                assert hub.publish("a", "x") == 1
+                assert (a.get_nowait(), b.empty()) == ("x", True)
+            assert hub.subscriber_count("a") == 0
+        asyncio.run(run())
+
+    def test_slow_subscriber_is_dropped(self):
+        """A full queue drops only that subscriber, whose stream then ends"""
+        async def run():
+            hub = EventHub(queue_size=2)
+            slow, fast = hub.subscribe("t"), hub.subscribe("t")
+            for i in range(3):
+                hub.publish("t", str(i))
+                fast.get_nowait()
+            assert hub.subscriber_count("t") == 1
+            assert slow.get_nowait() is DROPPED
+            slow.put_nowait(DROPPED)
+            frames = [frame async for frame in event_stream(slow)]
+            assert frames == ["event: dropped\ndata: {}\n\n"]
+        asyncio.run(run())
+
+class TestSubmissionEvents:
+    """Tests for GET /api/submissions/{id}/events"""
+
+    def test_stream_ends_with_final_status(self, monkeypatch):
+        monkeypatch.setattr(submissions, "GRADING_INLINE_WAIT", 30)
+        with TestClient(app) as client:
+            created = client.post("/api/submissions/", json={"challenge_id": 2, "solution": "def is_valid(s): return 1"})
+            response = client.get(f"/api/submissions/{created.json()['id']}/events")
+            assert response.headers["content-type"].startswith("text/event-stream")
+            data = [json.loads(line[6:]) for line in response.text.splitlines() if line.startswith("data: ")]
+            assert [d["status"] for d in data] == ["rejected"] and "solution" not in data[0]
+
+    def test_delete_ends_stream(self):
+        """Deleting a pending submission ends its watchers' streams with a deleted event"""
+        # Created before the grader starts, so it stays pending
+        submission_id = TestClient(app).post("/api/submissions/", json={"challenge_id": 7, "solution": "x"}).json()["id"]
+        frames = []
+        with TestClient(app) as client:  # one event loop for the watcher and the delete
+
+            def watch():
+                with client.stream("GET", f"/api/submissions/{submission_id}/events") as response:
+                    frames.extend(response.iter_lines())
+
+            watcher = threading.Thread(target=watch)
+            watcher.start()
+            for _ in range(500):
+                if event_hub.subscriber_count(("submission", submission_id)):
+                    break
+                time.sleep(0.01)
+            assert client.delete(f"/api/submissions/{submission_id}").status_code == 200
+            watcher.join(5)
+        assert not watcher.is_alive()
+        assert json.loads(frames[1][6:])["status"] == "pending"
+        assert frames[-3:-1] == ["event: deleted", "data: {}"]
+
+    def test_unknown_ids(self):
+        with TestClient(app) as client:
+            assert client.get("/api/submissions/nope/events").status_code == 404
+            assert client.get("/api/challenges/999/events").status_code == 404
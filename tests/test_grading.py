@@ -0,0 +1,281 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from main import app
+from models import SubmissionStatus
+from routers import submissions
+import grading
+from grading import Grader, ResultCache, solution_key
+
+TWO_SUM = """
+def two_sum(nums, target):
+    seen = {}
+    for i, num in enumerate(nums):
+        if target - num in seen:
+            return [seen[target - num], i]
+        seen[num] = i
+"""
+
+class TestGradingPipeline:
+    """Tests for the process-pool grading behind create_submission"""
+
+    def submit(self, client, solution, challenge_id=1):
+        response = client.post("/api/submissions/", json={"challenge_id": challenge_id, "solution": solution})
+        return response.status_code, response.json()
+
+    def test_graded_against_test_cases(self, monkeypatch):
+        """Correct, wrong and non-compiling solutions get their final status inline"""
+        monkeypatch.setattr(submissions, "GRADING_INLINE_WAIT", 30)
+        with TestClient(app) as client:
+            assert self.submit(client, TWO_SUM)[1]["status"] == "accepted"
+            code, body = self.submit(client, "def two_sum(nums, target):\n    return [0, 1]\n")
+            assert (code, body["status"], body["score"]) == (201, "rejected", 50)
+            assert self.submit(client, "def two_sum(:")[1]["status"] == "rejected"
+
+    def test_system_exit_is_rejected(self, monkeypatch):
+        """Solutions raising SystemExit are rejected and the grader keeps working"""
+        monkeypatch.setattr(submissions, "GRADING_INLINE_WAIT", 30)
+        with TestClient(app) as client:
+            assert self.submit(client, "raise SystemExit")[1]["status"] == "rejected"
+            code, body = self.submit(client, "def two_sum(nums, target):\n    raise KeyboardInterrupt\n")
+            assert (code, body["status"], body["score"]) == (201, "rejected", 0)
+            assert self.submit(client, TWO_SUM.replace("seen", "index"))[1]["status"] == "accepted"
+
+    def test_slow_grading_answers_202(self, monkeypatch):
+        """A run that outlasts the inline wait is answered PENDING and finished later"""
+        monkeypatch.setattr(submissions, "GRADING_INLINE_WAIT", 0)
+        submissions.grader.cache.clear()  # an earlier test may have graded TWO_SUM already
+        with TestClient(app) as client:
+            code, body = self.submit(client, TWO_SUM)
+            assert (code, body["status"]) == (202, "pending")
+
+    def test_identical_solutions_share_one_run(self, monkeypatch):
+        """Copies differing in line endings coalesce onto one in-flight run, then hit the result cache"""
+        monkeypatch.setattr(submissions, "GRADING_INLINE_WAIT", 30)
+        submissions.grader.cache.clear()
+        runs = []
+        grade = submissions.grader.grade
+
+        async def counting_grade(job):
+            runs.append(job.submission_id)
+            return await grade(job)
+
+        monkeypatch.setattr(submissions.grader, "grade", counting_grade)
+        copies = [TWO_SUM, TWO_SUM.replace("\n", "\r\n") + "  \n\n"]
+        with TestClient(app) as client:
+            batch = client.post("/api/submissions/bulk",
+                                json=[{"challenge_id": 1, "solution": s} for s in copies]).json()
+            code, body = self.submit(client, copies[1])
+            assert (code, body["status"], body["score"]) == (201, "accepted", 100)
+            for result in batch["results"]:
+                assert client.get(f"/api/submissions/{result['id']}").json()["status"] == "accepted"
+        assert len(runs) == 1
+
+    def test_backlog_is_bounded(self):
+        """Jobs beyond the queue and backlog are finished as ERROR instead of held"""
+        results = {}
+
+        async def on_result(submission_id, status, score):
+            results[submission_id] = status
+
+        async def scenario():
+            grader = Grader(on_result, workers=1, queue_size=1, backlog_size=1)
+            release = asyncio.Event()
+
+            async def blocked_grade(job):
+                await release.wait()
+                return SubmissionStatus.ACCEPTED, 100
+
+            grader.grade = blocked_grade
+            await grader.start()
+            try:
+                assert grader.has_room(2) and not grader.has_room(3)
+                assert grader.submit_many([(f"s{i}", 1, f"x = {i}") for i in range(4)]) == 1
+                assert not grader.has_room()
+                release.set()
+                for _ in range(500):
+                    if len(results) == 4:
+                        break
+                    await asyncio.sleep(0.01)
+                assert grader.backlog == 0 and grader.has_room(2)
+            finally:
+                await grader.stop()
+
+        asyncio.run(scenario())
+        ok, error = SubmissionStatus.ACCEPTED, SubmissionStatus.ERROR
+        assert results == {"s0": ok, "s1": ok, "s2": error, "s3": error}
+
+    def test_crash_only_fails_its_own_job(self):
+        """A run that kills its worker is an ERROR; runs on the same broken pool are retried"""
+        results = {}
+
+        async def on_result(submission_id, status, score):
+            results[submission_id] = status
+
+        async def scenario():
+            grader = Grader(on_result, workers=2)
+            await grader.start()
+            try:
+                crash = "import os, time\ntime.sleep(0.2)\nos.kill(os.getpid(), 9)\n"
+                slow = "import time\ntime.sleep(1)\n" + TWO_SUM
+                grader.submit_many([("crash", 1, crash), ("slow", 1, slow)])
+                for _ in range(1500):
+                    if len(results) == 2:
+                        break
+                    await asyncio.sleep(0.01)
+            finally:
+                await grader.stop()
+
+        asyncio.run(scenario())
+        assert results == {"crash": SubmissionStatus.ERROR, "slow": SubmissionStatus.ACCEPTED}
+
+    def test_run_ignoring_limits_is_killed(self, monkeypatch):
+        """A run that swallows its time-limit signal is killed, and the worker grades on"""
+        monkeypatch.setattr(grading, "GRADING_TIME_LIMIT", 0.2)
+        monkeypatch.setattr(grading, "GRADING_CPU_LIMIT", 1)
+        monkeypatch.setattr(grading, "GRADING_KILL_GRACE", 0.5)
+        stubborn = ("import time\ndef two_sum(nums, target):\n    while True:\n"
+                    "        try:\n            time.sleep(1000)\n        except BaseException:\n            pass\n")
+        results = {}
+
+        async def on_result(submission_id, status, score):
+            results[submission_id] = status
+
+        async def scenario():
+            grader = Grader(on_result, workers=1)
+            await grader.start()
+            try:
+                stuck = grader.submit("stuck", 1, stubborn)
+                assert await stuck == (SubmissionStatus.ERROR, 0)
+                assert await grader.submit("next", 1, TWO_SUM) == (SubmissionStatus.ACCEPTED, 100)
+            finally:
+                await asyncio.wait_for(grader.stop(), 5)
+
+        asyncio.run(scenario())
+        assert results == {"stuck": SubmissionStatus.ERROR, "next": SubmissionStatus.ACCEPTED}
+
+    def test_limit_hits_are_not_cached(self, monkeypatch):
+        """A verdict cut short by the time limit is not reused for identical copies"""
+        monkeypatch.setattr(grading, "GRADING_TIME_LIMIT", 0.2)
+        slow = "import time\ntime.sleep(0.5)\n" + TWO_SUM
+        results = []
+
+        async def on_result(submission_id, status, score):
+            results.append(status)
+
+        async def scenario():
+            grader = Grader(on_result, workers=1)
+            await grader.start()
+            try:
+                assert await grader.submit("slow", 1, slow) == (SubmissionStatus.REJECTED, 0)
+                assert len(grader.cache) == 0
+                assert await grader.submit("fast", 1, TWO_SUM) == (SubmissionStatus.ACCEPTED, 100)
+                assert len(grader.cache) == 1
+            finally:
+                await grader.stop()
+
+        asyncio.run(scenario())
+        assert results == [SubmissionStatus.REJECTED, SubmissionStatus.ACCEPTED]
+
+class TestBulkSubmissions:
+    """Tests for POST /api/submissions/bulk"""
+
+    def test_json_array_with_errors(self):
+        """Valid items get ids, invalid ones get per-item errors, all in one response"""
+        items = [{"challenge_id": 1, "solution": TWO_SUM}, {"solution": "x"},
+                 {"challenge_id": 99, "solution": "print('hello world')"}]
+        with TestClient(app) as client:
+            response = client.post("/api/submissions/bulk", json=items)
+            assert response.status_code == 202
+            body = response.json()
+            assert (body["accepted"], body["rejected"]) == (2, 1)
+            first, bad, third = body["results"]
+            assert bad["index"] == 1 and "challenge_id" in bad["error"]
+            for result in (first, third):
+                assert client.get(f"/api/submissions/{result['id']}").status_code == 200
+
+    def test_ndjson_body(self):
+        """NDJSON lines are validated individually; unparsable lines are reported by index"""
+        body = '{"challenge_id": 2, "solution": "def is_valid(s): return True"}\nnot json\n'
+        with TestClient(app) as client:
+            response = client.post("/api/submissions/bulk", content=body,
+                                   headers={"Content-Type": "application/x-ndjson"})
+            results = response.json()["results"]
+            assert "id" in results[0] and results[1] == {"index": 1, "error": "Invalid JSON"}
+
+    def test_full_grading_queue(self, monkeypatch):
+        """A batch the grader cannot take is refused with 503 and nothing is stored"""
+        monkeypatch.setattr(submissions.grader, "queue_size", 1)
+        monkeypatch.setattr(submissions.grader, "backlog_size", 0)
+        items = [{"challenge_id": 1, "solution": f"def two_sum(a, b): return [{i}]"} for i in range(2)]
+        with TestClient(app) as client:
+            before = client.get("/api/submissions/", params={"limit": 1}).json()["total"]
+            response = client.post("/api/submissions/bulk", json=items)
+            assert response.status_code == 503 and response.headers["retry-after"] == "5"
+            assert client.get("/api/submissions/", params={"limit": 1}).json()["total"] == before
+
+    def test_id_collision_is_per_item(self, monkeypatch):
+        """An item whose generated id is already taken gets an error; the rest are stored"""
+        with TestClient(app) as client:
+            taken = client.post("/api/submissions/", json={"challenge_id": 3, "solution": "x" * 20}).json()["id"]
+            generated = iter([taken, "sub_fresh_bulk"])
+            monkeypatch.setattr(submissions, "new_submission_id", lambda now: next(generated))
+            items = [{"challenge_id": 3, "solution": "y" * 20}, {"challenge_id": 3, "solution": "z" * 20}]
+            response = client.post("/api/submissions/bulk", json=items)
+            assert response.status_code == 202
+            body = response.json()
+            assert (body["accepted"], body["rejected"]) == (1, 1)
+            assert "collision" in body["results"][0]["error"]
+            assert body["results"][1] == {"index": 1, "id": "sub_fresh_bulk"}
+            assert client.get(f"/api/submissions/{taken}").json()["solution"] == "x" * 20
+
+    def test_batch_limit(self, monkeypatch):
+        monkeypatch.setattr(submissions, "BULK_MAX_SUBMISSIONS", 2)
+        with TestClient(app) as client:
+            items = [{"challenge_id": 1, "solution": "x"}] * 3
+            assert client.post("/api/submissions/bulk", json=items).status_code == 413
+
+class TestResultCache:
+    """Tests for solution keys and the bounded grading result cache"""
+
+    def test_key_ignores_line_endings_not_content(self):
+        base = solution_key(1, "def f():\n    return 1\n")
+        assert solution_key(1, "def f():\r\n    return 1  \r\n\n") == base
+        assert solution_key(1, "def f():\n  return 1\n") != base
+        assert solution_key(2, "def f():\n    return 1\n") != base
+        # Blank lines and trailing spaces inside a string literal change the result
+        text = 'def f():\n    return """a  \n\nb"""\n'
+        assert solution_key(1, text) != solution_key(1, text.replace("a  \n\n", "a\n"))
+
+    def test_untested_challenges_skip_cache(self):
+        """basic_grade challenges are graded per job, never cached or joined"""
+        results = []
+
+        async def on_result(submission_id, status, score):
+            results.append(submission_id)
+
+        async def scenario():
+            grader = Grader(on_result, workers=1)
+            await grader.start()
+            try:
+                futures = [grader.submit(f"s{i}", 7, "print('hello world')") for i in range(2)]
+                assert await asyncio.gather(*futures) == [(SubmissionStatus.ACCEPTED, 85)] * 2
+                assert not grader.inflight and len(grader.cache) == 0
+            finally:
+                await grader.stop()
+
+        asyncio.run(scenario())
+        assert results == ["s0", "s1"]
+
+    def test_lru_and_ttl(self, monkeypatch):
+        cache = ResultCache(max_entries=2, ttl=10)
+        now = [100.0]
+        monkeypatch.setattr(grading.time, "monotonic", lambda: now[0])
+        cache.put("a", ("accepted", 100))
+        cache.put("b", ("rejected", 0))
+        cache.get("a")
+        cache.put("c", ("accepted", 100))
+        assert (cache.get("a"), cache.get("b")) == (("accepted", 100), None)
+        now[0] += 11
+        assert cache.get("c") is None and len(cache) == 1
@@ -0,0 +1,102 @@
+from fastapi.testclient import TestClient
+
+from main import app
+from models import SubmissionSummaryPage
+from routers import challenges
+
+class TestListSerialization:
+    """Tests for the typed page responses of the list endpoints"""
+
+    def test_challenge_page_shape(self):
+        """Challenge pages keep the envelope and item fields of the original dict responses"""
+        with TestClient(app) as client:
+            body = client.get("/api/challenges/", params={"limit": 2}).json()
+            assert set(body) == {"challenges", "total", "limit", "offset", "next_cursor", "timestamp"}
+            assert len(body["challenges"]) == 2 and body["next_cursor"]
+            assert set(body["challenges"][0]) == {"id", "name", "difficulty", "points", "description", "created_at"}
+
+    def test_submissions_without_solution(self):
+        """include_solution=false drops the solution from every item and nothing else"""
+        with TestClient(app) as client:
+            client.post("/api/submissions/bulk", json=[{"challenge_id": 4, "solution": "x" * 100}] * 3)
+            full = client.get("/api/submissions/", params={"challenge_id": 4}).json()
+            slim = client.get("/api/submissions/", params={"challenge_id": 4, "include_solution": False}).json()
+            assert full["total"] == slim["total"] >= 3
+            assert all(item["solution"] == "x" * 100 for item in full["submissions"])
+            for item, slim_item in zip(full["submissions"], slim["submissions"]):
+                del item["solution"]
+                assert item == slim_item
+            SubmissionSummaryPage.model_validate(slim)
+
+    def test_submission_page_schema(self):
+        """The documented response allows pages whose items have no solution"""
+        with TestClient(app) as client:
+            schema = client.get("/openapi.json").json()
+        response = schema["paths"]["/api/submissions/"]["get"]["responses"]["200"]
+        refs = {option["$ref"].rsplit("/", 1)[1]
+                for option in response["content"]["application/json"]["schema"]["anyOf"]}
+        assert refs == {"SubmissionPage", "SubmissionSummaryPage"}
+        assert "solution" not in schema["components"]["schemas"]["SubmissionSummary"]["properties"]
+
+class TestChallengeETags:
+    """Tests for cached challenge pages and conditional GET"""
+
+    def test_not_modified_until_write(self):
+        """Same page answers 304 for its ETag until a challenge is created"""
+        with TestClient(app) as client:
+            first = client.get("/api/challenges/", params={"limit": 50})
+            etag = first.headers["etag"]
+            repeat = client.get("/api/challenges/", params={"limit": 50}, headers={"If-None-Match": etag})
+            assert repeat.status_code == 304 and repeat.content == b""
+
+            created = client.post("/api/challenges/", json={"name": "New", "difficulty": "Easy", "points": 10})
+            changed = client.get("/api/challenges/", params={"limit": 50}, headers={"If-None-Match": etag})
+            assert changed.status_code == 200 and changed.headers["etag"] != etag
+            assert created.json()["id"] in [c["id"] for c in changed.json()["challenges"]]
+            client.delete(f"/api/challenges/{created.json()['id']}")
+
+    def test_pages_have_distinct_etags(self):
+        with TestClient(app) as client:
+            easy = client.get("/api/challenges/", params={"difficulty": "Easy"})
+            hard = client.get("/api/challenges/", params={"difficulty": "Hard"})
+            assert easy.headers["etag"] != hard.headers["etag"]
+            assert client.get("/api/challenges/", headers={"If-None-Match": "*"}).status_code == 304
+
+    def test_etag_ignores_timestamp(self):
+        """A re-rendered page with a new timestamp keeps the ETag of unchanged data"""
+        with TestClient(app) as client:
+            first = client.get("/api/challenges/", params={"limit": 5})
+            challenges.page_cache.clear()
+            second = client.get("/api/challenges/", params={"limit": 5}, headers={"If-None-Match": first.headers["etag"]})
+            assert second.status_code == 304
+
+    def test_unversioned_repository_is_not_cached(self, monkeypatch):
+        """Without a process-local version (SQL backend) pages are rendered per request, still with ETags"""
+        monkeypatch.setattr(type(challenges.challenge_repo), "version", property(lambda self: None))
+        challenges.page_cache.clear()
+        with TestClient(app) as client:
+            first = client.get("/api/challenges/", params={"limit": 5})
+            repeat = client.get("/api/challenges/", params={"limit": 5}, headers={"If-None-Match": first.headers["etag"]})
+            assert repeat.status_code == 304
+        assert challenges.page_cache.get((None, 5, 0, None, None)) is None
+
+class TestAggregates:
+    """Tests for /api/leaderboard and /api/challenges/{id}/stats"""
+
+    def test_status_updates_feed_stats_and_leaderboard(self):
+        """Manual status changes show up in the aggregates (no grader running to race them)"""
+        client = TestClient(app)
+        ids = [r["id"] for r in client.post("/api/submissions/bulk",
+                                            json=[{"challenge_id": 7, "solution": "x"}] * 2).json()["results"]]
+        client.put(f"/api/submissions/{ids[0]}/status", params={"status": "accepted", "score": 100})
+        client.put(f"/api/submissions/{ids[1]}/status", params={"status": "rejected", "score": 40})
+        board = client.get("/api/leaderboard/", params={"challenge_id": 7}).json()
+        assert [(e["rank"], e["submission_id"]) for e in board["leaderboard"]] == [(1, ids[0]), (2, ids[1])]
+        assert (board["stats"]["acceptance_rate"], board["stats"]["average_score"]) == (0.5, 70)
+        assert set(board) == {"leaderboard", "stats", "timestamp"}
+        schema = client.get("/openapi.json").json()
+        response = schema["paths"]["/api/leaderboard/"]["get"]["responses"]["200"]
+        assert response["content"]["application/json"]["schema"] == {"$ref": "#/components/schemas/Leaderboard"}
+        assert client.get("/api/challenges/999/stats").status_code == 404
+        stats = client.get("/api/challenges/1/stats").json()
+        assert stats["challenge_id"] == 1 and set(stats["by_status"]) == {"pending", "accepted", "rejected", "error"}
@@ -0,0 +1,24 @@
+from fastapi.testclient import TestClient
+
+from flask_app.app import create_app
+from main import app
+
+class TestMetrics:
+    """Tests for the /metrics endpoints of both apps"""
+
+    def test_flask_routes_by_rule(self):
+        client = create_app().test_client()
+        client.get('/health')
+        client.get('/no-such-page')
+        text = client.get('/metrics').get_data(as_text=True)
+        assert 'http_request_duration_seconds_count{method="GET",route="/health",status="200"}' in text
+        assert 'route="unmatched",status="404"' in text
+
+    def test_fastapi_routes_by_template(self):
+        with TestClient(app) as client:
+            client.get("/api/challenges/1")
+            client.post("/api/submissions/bulk", json=[])
+            text = client.get("/metrics").text
+        assert 'http_request_duration_seconds_count{method="GET",route="/api/challenges/{challenge_id}",status="200"}' in text
+        assert 'http_request_size_bytes_count{method="POST",route="/api/submissions/bulk"}' in text
+        assert 'http_requests_in_progress{method="GET"} 1.0' in text  # the /metrics request itself
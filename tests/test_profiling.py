@@ -0,0 +1,82 @@
+import time
+from collections import Counter
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from flask import Flask
+
+import profiling as fastapi_profiling
+from flask_app import profiling as flask_profiling
+from main import app as fastapi_app
+from observability import profiling as shared_profiling
+
+def busy_wait(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+    return "done"
+
+class TestProfiling:
+    """Tests for the opt-in sampling profiler"""
+
+    def test_ring_keeps_newest(self, tmp_path):
+        ring = shared_profiling.ProfileRing(str(tmp_path), size=3)
+        names = [ring.write(f"view{i}", Counter({"a;b": i + 1})) for i in range(5)]
+        assert ring.names() == names[:1:-1]
+        assert (tmp_path / names[-1]).read_text() == "a;b 5\n"
+
+    def test_flask_header_profiles_view(self, tmp_path, monkeypatch):
+        """A request with the token header leaves a collapsed-stack file naming the hot function"""
+        monkeypatch.setattr(shared_profiling, "PROFILE_TOKEN", "secret")
+        monkeypatch.setattr(flask_profiling, "profile_ring", shared_profiling.ProfileRing(str(tmp_path)))
+        app = Flask(__name__)
+        app.add_url_rule("/busy", "busy", flask_profiling.profiled(lambda: busy_wait(0.1)))
+        flask_profiling.init_profiling(app)
+        client = app.test_client()
+
+        client.get("/busy")
+        assert client.get("/api/profiles", headers={"X-Profile": "secret"}).json == {"profiles": []}
+        client.get("/busy", headers={"X-Profile": "secret"})
+        names = client.get("/api/profiles", headers={"X-Profile": "secret"}).json["profiles"]
+        assert len(names) == 1
+        assert client.get(f"/api/profiles/{names[0]}").status_code == 403
+        profile = client.get(f"/api/profiles/{names[0]}", headers={"X-Profile": "secret"}).get_data(as_text=True)
+        assert "busy_wait (test_profiling.py:" in profile
+
+    def test_downloads_need_token(self, tmp_path, monkeypatch):
+        """Sampling without PROFILE_TOKEN still records profiles, but nobody can download them"""
+        monkeypatch.setattr(shared_profiling, "PROFILE_SAMPLE_RATE", 1.0)
+        monkeypatch.setattr(flask_profiling, "profile_ring", shared_profiling.ProfileRing(str(tmp_path)))
+        app = Flask(__name__)
+        flask_profiling.init_profiling(app)
+        assert app.test_client().get("/api/profiles").status_code == 404
+        with TestClient(fastapi_app) as client:
+            assert client.get("/api/profiles/").status_code == 404
+
+    def test_disabled_is_passthrough(self):
+        """With no token or sample rate the view is not wrapped and the endpoints 404"""
+        view = lambda: None
+        assert flask_profiling.profiled(view) is view
+        with TestClient(fastapi_app) as client:
+            assert client.get("/api/profiles/").status_code == 404
+
+    def test_fastapi_middleware(self, tmp_path, monkeypatch):
+        """An async endpoint is sampled on the event loop thread it runs on"""
+        monkeypatch.setattr(shared_profiling, "PROFILE_TOKEN", "secret")
+        monkeypatch.setattr(fastapi_profiling, "PROFILE_ROUTES", {"GET /busy"})
+        monkeypatch.setattr(fastapi_profiling, "profile_ring", shared_profiling.ProfileRing(str(tmp_path)))
+        app = FastAPI()
+
+        @app.get("/busy")
+        async def busy():
+            busy_wait(0.1)
+
+        app.add_middleware(fastapi_profiling.ProfilingMiddleware)
+        app.include_router(fastapi_profiling.router, prefix="/api/profiles")
+        client = TestClient(app)
+
+        client.get("/busy", headers={"X-Profile": "secret"})
+        names = client.get("/api/profiles/", headers={"X-Profile": "secret"}).json()["profiles"]
+        assert len(names) == 1 and names[0].endswith("-GET_busy.folded")
+        profile = client.get(f"/api/profiles/{names[0]}", headers={"X-Profile": "secret"}).text
+        assert "busy_wait (test_profiling.py:" in profile
@@ -0,0 +1,115 @@
+import asyncio
+import random
+from datetime import datetime
+
+from database import ChallengeRow, create_engine, create_sessionmaker, create_tables
+from models import ChallengeCreate, DifficultyLevel, SAMPLE_CHALLENGES, Submission, SubmissionStatus
+from repository import (
+    MemorySubmissionRepository, SQLChallengeRepository, SQLSubmissionRepository,
+    _row_data, insert_ignoring_duplicates,
+)
+
+def run(coro):
+    return asyncio.run(coro)
+
+class TestSQLRepositories:
+    """Tests for the SQLAlchemy-backed repositories on a temporary SQLite file"""
+
+    async def open(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+        await create_tables(engine)
+        sessionmaker = create_sessionmaker(engine)
+        return engine, SQLChallengeRepository(sessionmaker), SQLSubmissionRepository(sessionmaker)
+
+    def test_challenge_crud(self, tmp_path):
+        """Seeded challenges can be created, filtered, updated and deleted"""
+        async def scenario():
+            engine, challenges, _ = await self.open(tmp_path)
+            await challenges.seed()
+            created = await challenges.create(ChallengeCreate(name="Graph", difficulty="Hard", points=50))
+            page, total, _ = await challenges.list(DifficultyLevel.HARD)
+            assert total == 2 and page[-1] == created
+            updated = await challenges.update(created.id, ChallengeCreate(name="Graphs", difficulty="Easy", points=60))
+            assert updated.created_at == created.created_at and updated.difficulty == DifficultyLevel.EASY
+            assert await challenges.delete(created.id) and await challenges.get(created.id) is None
+            await engine.dispose()
+        run(scenario())
+
+    def test_concurrent_seed(self, tmp_path):
+        """Workers seeding one database at once leave a single copy of each sample"""
+        async def scenario():
+            engines = [create_engine(f"sqlite:///{tmp_path / 'test.db'}") for _ in range(3)]
+            await create_tables(engines[0])
+            repos = [SQLChallengeRepository(create_sessionmaker(engine)) for engine in engines]
+            await asyncio.gather(*(repo.seed() for repo in repos))
+            # A worker that counted an empty table before the others committed
+            async with create_sessionmaker(engines[1]).begin() as session:
+                await session.execute(insert_ignoring_duplicates("sqlite", ChallengeRow),
+                                      [_row_data(c) for c in SAMPLE_CHALLENGES])
+            _, total, _ = await repos[0].list(limit=100)
+            assert total == len(SAMPLE_CHALLENGES)
+            for engine in engines:
+                await engine.dispose()
+        run(scenario())
+
+    def test_add_many_skips_taken_ids(self, tmp_path):
+        """Ids already stored or repeated within the batch are skipped, the rest inserted"""
+        async def scenario():
+            engine, _, submissions = await self.open(tmp_path)
+            make = lambda i: Submission(id=f"sub_{i}", challenge_id=1, solution="pass")
+            await submissions.add(make(0))
+            batch = [make(1), make(0), make(2), make(1)]
+            assert [s.id for s in await submissions.add_many(batch)] == ["sub_1", "sub_2"]
+            assert (await submissions.list(None, None, 10, 0))[1] == 3
+            await engine.dispose()
+        run(scenario())
+
+    def test_keyset_pages_match_offset(self, tmp_path):
+        """Seeking past the last seen row returns the same pages as OFFSET"""
+        async def scenario():
+            engine, _, submissions = await self.open(tmp_path)
+            for i in range(25):
+                await submissions.add(Submission(
+                    id=f"sub_{i:02d}", challenge_id=1 + i % 2, solution="pass",
+                    status=SubmissionStatus.ACCEPTED if i % 3 else SubmissionStatus.REJECTED,
+                    submitted_at=datetime(2025, 1, 1, 0, 0, i)))
+            await submissions.update_status("sub_04", SubmissionStatus.ERROR, 0)
+
+            for filters in ({}, {"challenge_id": 2}, {"status": SubmissionStatus.ACCEPTED}):
+                by_offset, total, _ = await submissions.list(limit=100, **filters)
+                assert total == len(by_offset)
+                seen, after = [], None
+                while True:
+                    page, _, after = await submissions.list(limit=4, after=after, **filters)
+                    seen.extend(page)
+                    if after is None:
+                        break
+                assert seen == by_offset
+            assert (await submissions.get("sub_04")).status == SubmissionStatus.ERROR
+            await engine.dispose()
+        run(scenario())
+
+    def test_stats_and_top_match_memory(self, tmp_path):
+        """Grouped SQL aggregates agree with the memory store's running ones"""
+        async def scenario():
+            engine, _, sql = await self.open(tmp_path)
+            memory = MemorySubmissionRepository()
+            rng = random.Random(3)
+            for i in range(60):
+                submission = Submission(id=f"sub_{i:02d}", challenge_id=rng.randint(1, 3), solution="pass",
+                                        submitted_at=datetime(2025, 1, 1, 0, 0, i))
+                for repo in (sql, memory):
+                    await repo.add(submission.model_copy())
+            for i in rng.sample(range(60), 40):
+                status, score = rng.choice(list(SubmissionStatus)), rng.choice([0, 50, 100])
+                for repo in (sql, memory):
+                    await repo.update_status(f"sub_{i:02d}", status, score)
+            for repo in (sql, memory):
+                await repo.delete("sub_07")
+
+            for challenge_id in (None, 1, 2, 3, 4):
+                assert await sql.stats(challenge_id) == await memory.stats(challenge_id)
+                assert [s.id for s in await sql.top(10, challenge_id)] == \
+                       [s.id for s in await memory.top(10, challenge_id)]
+            await engine.dispose()
+        run(scenario())
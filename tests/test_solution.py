@@ -0,0 +1,183 @@
+import random
+from math import inf
+
+from flask_app import solver
+from flask_app.solver import ByteLRU, FeeCache, solve_cached
+from solutions.solution_1 import solve, floyd_warshall_fees
+
+def solve_quadratic(input_obj):
+    """The original O(m^2) DP over every earlier task, kept as a reference"""
+    tasks = input_obj.get("tasks", [])
+    if not tasks:
+        return {"max_score": 0, "min_fee": 0, "schedule": []}
+    stations = {input_obj["starting_station"]} | {t["station"] for t in tasks}
+    for r in input_obj["subway"]:
+        stations.update(r["connection"])
+    id_to_idx = {sid: i for i, sid in enumerate(sorted(stations))}
+    s0 = id_to_idx[input_obj["starting_station"]]
+    edges = [(id_to_idx[r["connection"][0]], id_to_idx[r["connection"][1]], r["fee"])
+             for r in input_obj["subway"]]
+    dist = floyd_warshall_fees(len(id_to_idx), edges)
+
+    T = [dict(t, station=id_to_idx[t["station"]]) for t in tasks]
+    T.sort(key=lambda x: (x["end"], x["start"]))
+    m = len(T)
+    bestScore, minFeeToEnd, prev = [0]*m, [inf]*m, [-1]*m
+    for i in range(m):
+        si = T[i]["station"]
+        bScore, bFee, p = T[i]["score"], dist[s0][si], -1
+        for j in range(i):
+            if T[j]["end"] <= T[i]["start"]:
+                candScore = bestScore[j] + T[i]["score"]
+                candFee = minFeeToEnd[j] + dist[T[j]["station"]][si]
+                if (candScore > bScore) or (candScore == bScore and candFee < bFee):
+                    bScore, bFee, p = candScore, candFee, j
+        bestScore[i], minFeeToEnd[i], prev[i] = bScore, bFee, p
+
+    ansScore, ansFee, last = 0, 0, -1
+    for i in range(m):
+        totalFee = minFeeToEnd[i] + dist[T[i]["station"]][s0]
+        if (bestScore[i] > ansScore) or (bestScore[i] == ansScore and totalFee < ansFee):
+            ansScore, ansFee, last = bestScore[i], totalFee, i
+    if ansScore == 0:
+        return {"max_score": 0, "min_fee": 0, "schedule": []}
+    chosen = []
+    while last != -1:
+        chosen.append(T[last])
+        last = prev[last]
+    chosen.sort(key=lambda x: (x["start"], x["end"], x["name"]))
+    return {"max_score": ansScore, "min_fee": ansFee, "schedule": [t["name"] for t in chosen]}
+
+def random_instance(seed, max_tasks=12, max_stations=8):
+    """Random schedule instance; station IDs are sparse and some are unreachable"""
+    rng = random.Random(seed)
+    station_ids = rng.sample(range(100), rng.randint(1, max_stations))
+    tasks = []
+    for i in range(rng.randint(0, max_tasks)):
+        start = rng.randint(0, 20)
+        tasks.append({
+            "name": f"T{i}",
+            "start": start,
+            "end": start + rng.randint(0, 6),
+            "station": rng.choice(station_ids),
+            "score": rng.randint(1, 5),
+        })
+    subway = [
+        {"connection": [rng.choice(station_ids), rng.choice(station_ids)], "fee": rng.randint(0, 9)}
+        for _ in range(rng.randint(0, 2 * len(station_ids)))
+    ]
+    return {"tasks": tasks, "subway": subway, "starting_station": rng.choice(station_ids)}
+
+def disconnected_instance(seed, max_tasks=20, max_stations=8):
+    """Two subway networks with no link between them and unit scores, so many ties carry an inf fee"""
+    rng = random.Random(seed)
+    station_ids = rng.sample(range(100), rng.randint(2, max_stations))
+    cut = rng.randint(1, len(station_ids) - 1)
+    networks = (station_ids[:cut], station_ids[cut:])
+    tasks = []
+    for i in range(rng.randint(1, max_tasks)):
+        start = rng.randint(0, 20)
+        tasks.append({"name": f"T{i}", "start": start, "end": start + rng.randint(0, 6),
+                      "station": rng.choice(station_ids), "score": 1})
+    subway = []
+    for _ in range(rng.randint(0, 3 * len(station_ids))):
+        network = rng.choice(networks)
+        subway.append({"connection": [rng.choice(network), rng.choice(network)], "fee": rng.randint(0, 9)})
+    return {"tasks": tasks, "subway": subway, "starting_station": rng.choice(networks[0])}
+
+class TestSolutionOne:
+    """Tests for the subway schedule solver"""
+
+    def test_example(self):
+        """Single reachable task is taken with the round-trip fee"""
+        result = solve({
+            "tasks": [{"name": "A", "start": 0, "end": 10, "station": 1, "score": 5}],
+            "subway": [{"connection": [0, 1], "fee": 10}],
+            "starting_station": 0,
+        })
+        assert result == {"max_score": 5, "min_fee": 20, "schedule": ["A"]}
+
+    def test_sparse_matches_dense(self):
+        """Dijkstra from task stations gives the same answer as Floyd–Warshall"""
+        for seed in range(300):
+            instance = random_instance(seed)
+            assert solve(instance, fee_mode="sparse") == solve(instance, fee_mode="dense")
+
+    def test_matches_quadratic_dp(self):
+        """Indexed DP picks the same score, fee and schedule as the original O(m^2) DP"""
+        for seed in range(2000):
+            instance = random_instance(seed, max_tasks=40 if seed % 10 == 0 else 12)
+            assert solve(instance) == solve_quadratic(instance)
+
+    def test_float_scores(self):
+        """Non-integer scores are kept as floats instead of failing the packed columns"""
+        for seed in range(300):
+            instance = random_instance(seed)
+            for k, task in enumerate(instance["tasks"]):
+                task["score"] = task["score"] + (0.5, 0.25, 0.0)[k % 3]
+            assert solve(instance) == solve_quadratic(instance)
+        result = solve({
+            "tasks": [{"name": "A", "start": 0, "end": 10, "station": 1, "score": 2.5}],
+            "subway": [{"connection": [0, 1], "fee": 10}],
+            "starting_station": 0,
+        })
+        assert result == {"max_score": 2.5, "min_fee": 20, "schedule": ["A"]}
+
+    def test_scores_summing_past_64_bits(self):
+        """Scores that each fit a packed column may still add up beyond it"""
+        instance = {
+            "tasks": [{"name": "A", "start": 0, "end": 10, "station": 0, "score": 2**62},
+                      {"name": "B", "start": 10, "end": 20, "station": 0, "score": 2**62}],
+            "subway": [{"connection": [0, 1], "fee": 10}],
+            "starting_station": 0,
+        }
+        assert solve(instance) == {"max_score": 2**63, "min_fee": 0, "schedule": ["A", "B"]}
+
+    def test_matches_quadratic_dp_disconnected(self):
+        """Ties between unreachable (inf fee) predecessors resolve to the same task as the original DP"""
+        for seed in range(5000):
+            instance = disconnected_instance(seed)
+            assert solve(instance) == solve_quadratic(instance)
+
+class TestSolverCache:
+    """Tests for the cached solution_1 endpoint helpers"""
+
+    def test_byte_lru_evicts_oldest(self):
+        """Entries are evicted least-recently-used first once the byte budget is exceeded"""
+        lru = ByteLRU(10)
+        lru.put("a", 1, 4)
+        lru.put("b", 2, 4)
+        lru.get("a")
+        lru.put("c", 3, 4)
+        assert lru.get("b") is None
+        assert lru.get("a") == 1 and lru.get("c") == 3
+        assert lru.bytes == 8
+
+    def test_fee_cache_reuses_network(self, monkeypatch):
+        """A second task set on the same network only computes rows for new sources"""
+        computed = []
+        real = solver.dijkstra_fees
+        monkeypatch.setattr(solver, "dijkstra_fees",
+                            lambda n, edges, sources: computed.append(sources) or real(n, edges, sources))
+        cache = FeeCache()
+        station_ids = [10, 20, 30, 40]
+        edges = [(0, 1, 5), (1, 2, 1), (2, 3, 7), (0, 3, 20)]
+        first = cache(station_ids, edges, [0, 2], "sparse")
+        second = cache(station_ids, edges, [0, 2, 3], "sparse")
+        assert computed == [[3]]
+        assert first[0] is second[0] and second[3] == [13, 8, 7, 0]
+
+    def test_solve_with_fee_cache(self):
+        """Solving through the cache gives the same answers as the original DP"""
+        cache = FeeCache()
+        for seed in range(100):
+            instance = random_instance(seed)
+            fewer = dict(instance, tasks=instance["tasks"][::2])
+            for variant in (instance, fewer, instance):
+                assert solve(variant, fees=cache) == solve_quadratic(variant)
+
+    def test_solve_cached_hits(self):
+        """Identical inputs are served from the result cache"""
+        instance = random_instance(3)
+        result, hit = solve_cached(instance)
+        assert solve_cached(dict(reversed(list(instance.items())))) == (result, True)
@@ -0,0 +1,155 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+from models import ChallengeCreate, ChallengePage, DifficultyLevel, SAMPLE_CHALLENGES, Submission, SubmissionStatus
+from pagination import encode_page
+from store import ChallengeStore, SubmissionStore
+
+def make_submission(i, rng):
+    return Submission(
+        id=f"sub_{i}",
+        challenge_id=rng.randint(1, 4),
+        solution="print(42)",
+        status=rng.choice(list(SubmissionStatus)),
+    )
+
+class TestSubmissionStore:
+    """Tests for the indexed in-memory submission store"""
+
+    def test_indexes_match_linear_filter(self):
+        """Random creates, status updates and deletes keep every index consistent"""
+        rng = random.Random(0)
+        store, reference = SubmissionStore(), {}
+        for i in range(2000):
+            op = rng.random()
+            if op < 0.5 or not reference:
+                sub = store.add(make_submission(i, rng))
+                reference[sub.id] = sub
+            elif op < 0.8:
+                sid = rng.choice(list(reference))
+                store.update_status(sid, rng.choice(list(SubmissionStatus)), rng.randint(0, 100))
+            else:
+                sid = rng.choice(list(reference))
+                store.delete(sid)
+                del reference[sid]
+
+            if i % 50 == 0:
+                for challenge_id in (None, 1, 2, 3, 4, 5):
+                    for status in [None] + list(SubmissionStatus):
+                        expected = [s for s in reference.values()
+                                    if (challenge_id is None or s.challenge_id == challenge_id)
+                                    and (status is None or s.status == status)]
+                        page, total, _ = store.list(challenge_id, status, limit=7, offset=3)
+                        assert total == len(expected)
+                        assert page == expected[3:10]
+
+                        # Walking the cursor visits the same rows as offset slicing
+                        seen, after = [], None
+                        while True:
+                            page, _, after = store.list(challenge_id, status, limit=4, after=after)
+                            seen.extend(page)
+                            if after is None:
+                                break
+                        assert seen == expected
+
+    def test_missing_ids(self):
+        """Unknown ids return None instead of raising"""
+        store = SubmissionStore()
+        assert store.get("nope") is None
+        assert store.update_status("nope", SubmissionStatus.ACCEPTED) is None
+        assert store.delete("nope") is None
+
+    def test_add_many_skips_taken_ids(self):
+        """Colliding ids are left out of a batch instead of failing all of it"""
+        rng = random.Random(1)
+        store = SubmissionStore()
+        store.add(make_submission(0, rng))
+        batch = [make_submission(i, rng) for i in (1, 0, 2, 1)]
+        assert [s.id for s in store.add_many(batch)] == ["sub_1", "sub_2"]
+        assert store.list(None, None, 10, 0)[1] == 3
+        assert store.get("sub_1") is batch[0]
+
+    def test_aggregates_match_scan(self):
+        """Running stats and top-N agree with a full scan after random writes"""
+        rng = random.Random(4)
+        store, reference = SubmissionStore(), {}
+        for i in range(1500):
+            op = rng.random()
+            if op < 0.4 or not reference:
+                sub = store.add(make_submission(i, rng).model_copy(update={"score": None}))
+                reference[sub.id] = sub
+            elif op < 0.85:
+                store.update_status(rng.choice(list(reference)), rng.choice(list(SubmissionStatus)),
+                                    rng.choice([None, 0, 25, 50, 100]))
+            else:
+                del reference[store.delete(rng.choice(list(reference))).id]
+
+            if i % 100 == 0:
+                order = list(reference.values())
+                for challenge_id in (None, 1, 2, 3, 4):
+                    subs = [s for s in order if challenge_id is None or s.challenge_id == challenge_id]
+                    scored = [s for s in subs if s.score is not None]
+                    stats = store.stats(challenge_id)
+                    assert stats["total"] == len(subs)
+                    assert stats["by_status"] == {st: sum(s.status == st for s in subs) for st in SubmissionStatus}
+                    assert (stats["scored"], stats["score_sum"]) == (len(scored), sum(s.score for s in scored))
+                    expected = sorted(scored, key=lambda s: -s.score)[:5]  # stable: ties stay in insertion order
+                    assert store.top(5, challenge_id) == expected
+
+class TestChallengeStore:
+    """Tests for the bucketed in-memory challenge store"""
+
+    def test_buckets_match_linear_filter(self):
+        """Random creates, updates and deletes keep the difficulty buckets consistent"""
+        rng = random.Random(1)
+        store = ChallengeStore(SAMPLE_CHALLENGES)
+        reference = {c.id: c for c in SAMPLE_CHALLENGES}
+        for i in range(500):
+            create = ChallengeCreate(name=f"C{i}", difficulty=rng.choice(list(DifficultyLevel)),
+                                     points=rng.randint(1, 500))
+            op = rng.random()
+            if op < 0.5 or not reference:
+                challenge = store.create(create)
+                assert challenge.id > max(reference, default=0)
+                reference[challenge.id] = challenge
+            elif op < 0.8:
+                cid = rng.choice(list(reference))
+                reference[cid] = store.update(cid, create)
+            else:
+                del reference[store.delete(rng.choice(list(reference))).id]
+
+            for difficulty in [None] + list(DifficultyLevel):
+                expected = [c for _, c in sorted(reference.items())
+                            if difficulty is None or c.difficulty == difficulty]
+                page, total, _ = store.list(difficulty, limit=5, offset=2)
+                assert (page, total) == (expected[2:7], len(expected))
+
+    def test_concurrent_writes(self):
+        """Threaded creates get distinct ids and read-modify-write updates are not lost"""
+        store = ChallengeStore(SAMPLE_CHALLENGES)
+        create = ChallengeCreate(name="X", difficulty=DifficultyLevel.EASY, points=1)
+        bump = lambda c: c.model_copy(update={"points": c.points + 1})
+        with ThreadPoolExecutor(8) as pool:
+            ids = list(pool.map(lambda _: store.create(create).id, range(400)))
+            list(pool.map(lambda _: store.modify(1, bump), range(400)))
+        assert len(set(ids)) == 400
+        assert store.get(1).points == SAMPLE_CHALLENGES[0].points + 400
+        assert store.version == 800
+
+    def test_snapshot_copy_on_write(self):
+        """Writes publish a new snapshot, leave the old one intact and reuse unchanged encodings"""
+        store = ChallengeStore(SAMPLE_CHALLENGES)
+        before = store.snapshot
+        created = store.create(ChallengeCreate(name="New", difficulty=DifficultyLevel.HARD, points=5))
+        after = store.snapshot
+        assert created.id not in before.items and before.buckets[DifficultyLevel.HARD] == (3,)
+        assert after.buckets[DifficultyLevel.HARD] == (3, created.id)
+        assert all(after.encoded[i] is before.encoded[i] for i in before.ids)
+
+    def test_encoded_page_matches_model_dump(self):
+        store = ChallengeStore(SAMPLE_CHALLENGES)
+        fields = dict(total=3, limit=2, offset=0, next_cursor=None, timestamp="2025-01-01T00:00:00")
+        items, _, _ = store.list(limit=2)
+        encoded, _, _ = store.list_encoded(limit=2)
+        expected = ChallengePage(challenges=items, **fields).model_dump_json().encode()
+        assert encode_page("challenges", encoded, **fields) == expected
@@ -0,0 +1,158 @@
+import json
+import random
+
+import pytest
+
+from flask_app.app import create_app
+
+from flask_app import ticketing
+from flask_app.ticketing import (
+    parse_concerts, assign_linear, assign_planned, assign_indexed, assign_numpy,
+    assign_parallel,
+)
+
+def random_payload(seed, max_concerts=30, max_customers=30):
+    """Small random payload with clustered coordinates, duplicate names and shared cards"""
+    rng = random.Random(seed)
+    nc = rng.randint(0, max_concerts)
+    nk = rng.randint(0, max_customers)
+    span = rng.choice([3, 10, 50])
+
+    def coord():
+        # Mix of integers and halves lands points exactly on the 2.0 / 4.0 band edges
+        return rng.choice([rng.uniform(-span, span), rng.randint(-span, span), rng.randint(-span, span) * 0.5])
+
+    concerts = [
+        {"name": f"C{rng.randint(0, nc)}", "booking_center_location": [coord(), coord()]}
+        for _ in range(nc)
+    ]
+    customers = [
+        {"name": f"P{i}", "vip_status": rng.random() < 0.5, "location": [coord(), coord()],
+         "credit_card": f"K{rng.randint(0, 5)}"}
+        for i in range(nk)
+    ]
+    priority = {f"K{k}": f"C{rng.randint(0, nc)}" for k in range(4)}
+    return customers, concerts, priority
+
+class TestTicketingScoring:
+    """Tests for the ticketing-agent scoring backends"""
+
+    def test_indexed_matches_linear(self):
+        """Grid index picks the same concert as the full scan, including ties"""
+        for seed in range(300):
+            customers, concerts, priority = random_payload(seed)
+            clist = parse_concerts(concerts)
+            assert assign_indexed(customers, clist, priority) == assign_linear(customers, clist, priority)
+
+    def test_plan_matches_linear(self, monkeypatch):
+        """Compiled plan agrees with the full scan, with and without the card short-circuit"""
+        for card_points in (ticketing.CARD_POINTS, 25, 10):
+            monkeypatch.setattr(ticketing, "CARD_POINTS", card_points)
+            for seed in range(150):
+                customers, concerts, priority = random_payload(seed)
+                clist = parse_concerts(concerts)
+                expected = assign_linear(customers, clist, priority)
+                assert assign_planned(customers, clist, priority) == expected
+                assert assign_indexed(customers, clist, priority) == expected
+
+    def test_numpy_matches_linear(self, monkeypatch):
+        """Vectorized backend agrees with the full scan across block boundaries"""
+        if ticketing.np is None:
+            pytest.skip("NumPy not installed")
+        monkeypatch.setattr(ticketing, "NUMPY_MIN_PAIRS", 0)
+        for seed in range(100):
+            customers, concerts, priority = random_payload(seed)
+            clist = parse_concerts(concerts)
+            expected = assign_linear(customers, clist, priority)
+            assert assign_numpy(customers, clist, priority, block_pairs=64) == expected
+
+    def test_parallel_matches_linear(self, monkeypatch):
+        """Process pool merges shards back in customer order"""
+        monkeypatch.setattr(ticketing, "POOL_MIN_CUSTOMERS", 0)
+        customers, concerts, priority = random_payload(11, max_concerts=40, max_customers=200)
+        clist = parse_concerts(concerts)
+        out = assign_parallel(customers, clist, priority, workers=2)
+        expected = assign_linear(customers, clist, priority)
+        assert out == expected
+        assert list(out) == list(expected)
+
+    def test_parallel_reuses_pool(self, monkeypatch):
+        """Requests share one long-lived pool instead of starting their own"""
+        monkeypatch.setattr(ticketing, "POOL_MIN_CUSTOMERS", 0)
+        customers, concerts, priority = random_payload(3, max_customers=50)
+        clist = parse_concerts(concerts)
+        assign_parallel(customers, clist, priority, workers=2)
+        pool = ticketing._get_pool(2)
+        assert assign_parallel(customers, clist, priority, workers=2) == assign_linear(customers, clist, priority)
+        assert ticketing._get_pool(2) is pool
+
+    def test_band_edges(self):
+        """Concerts exactly 2.0 and 4.0 away fall inside their bands"""
+        concerts = parse_concerts([
+            {"name": "Far", "booking_center_location": [10, 0]},
+            {"name": "Outer", "booking_center_location": [4, 0]},
+            {"name": "Inner", "booking_center_location": [0, 2]},
+        ])
+        customers = [{"name": "A", "vip_status": False, "location": [0, 0], "credit_card": "X"}]
+        assert assign_indexed(customers, concerts, {}) == {"A": "Inner"}
+        assert assign_indexed(customers, concerts, {"X": "Far"}) == {"A": "Far"}
+
+    def test_no_concerts(self):
+        """Customers get an empty string when there is nothing to book"""
+        customers = [{"name": "A", "vip_status": True, "location": [0, 0], "credit_card": "X"}]
+        assert assign_indexed(customers, [], {}) == {"A": ""}
+
+    def test_unknown_configured_backend(self, monkeypatch):
+        """A bad TICKETING_BACKEND stops the app from starting instead of failing each request"""
+        monkeypatch.setenv("TICKETING_BACKEND", "quantum")
+        with pytest.raises(ValueError):
+            create_app()
+
+    def test_backend_override_needs_debug(self):
+        """?backend= is ignored in production and honoured in debug or testing"""
+        payload = {"customers": [], "concerts": [], "priority": {}}
+        app = create_app()
+        app.config.update(DEBUG=False, TESTING=False)
+        assert app.test_client().post("/api/ticketing-agent?backend=quantum", json=payload).status_code == 200
+        app.config['TESTING'] = True
+        assert app.test_client().post("/api/ticketing-agent?backend=quantum", json=payload).status_code == 400
+        assert app.test_client().post("/api/ticketing-agent?backend=linear", json=payload).json == {}
+
+class TestTicketingStream:
+    """Tests for the NDJSON streaming ticketing endpoint"""
+
+    def post_stream(self, lines):
+        client = create_app().test_client()
+        body = "".join(json.dumps(line) + "\n" for line in lines)
+        return client.post("/api/ticketing-agent/stream", data=body,
+                           headers={"Content-Type": "application/x-ndjson"})
+
+    def test_stream_matches_batch(self):
+        """Streamed lines carry the same assignments as the batch scorer, in input order"""
+        customers, concerts, priority = random_payload(7, max_customers=50)
+        response = self.post_stream([{"concerts": concerts, "priority": priority}] + customers)
+        assert response.status_code == 200
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert [next(iter(line)) for line in lines] == [c["name"] for c in customers]
+        expected = assign_linear(customers, parse_concerts(concerts), priority)
+        assert {k: v for line in lines for k, v in line.items()} == expected
+
+    def test_stream_bad_customer_line(self):
+        """A malformed customer yields an error line without ending the stream"""
+        good = {"name": "A", "vip_status": False, "location": [0, 0], "credit_card": "X"}
+        response = self.post_stream([{"concerts": [], "priority": {}}, {"name": "B"}, good])
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert lines == [{"error": "Invalid customer on line 2"}, {"A": ""}]
+
+    def test_stream_non_string_name(self):
+        """A customer whose name is not a string gets an error line, not a broken stream"""
+        bad = {"name": ["A"], "vip_status": False, "location": [0, 0], "credit_card": "X"}
+        good = {"name": "B", "vip_status": False, "location": [0, 0], "credit_card": "X"}
+        response = self.post_stream([{"concerts": [], "priority": {}}, bad, good])
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert lines == [{"error": "Invalid customer on line 2"}, {"B": ""}]
+
+    def test_stream_requires_header(self):
+        """Missing or invalid header line is rejected before streaming starts"""
+        assert self.post_stream(["not a header"]).status_code == 400
+        assert self.post_stream([{"concerts": [], "priority": ["K1"]}]).status_code == 400